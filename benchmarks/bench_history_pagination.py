@@ -0,0 +1,80 @@
+"""Translation history latency against the length of a user's history: full load versus one keyset page.
+
+Fills a scratch SQLite database with users of growing history lengths, then times loading each user's
+whole history (as GET /api/v1/translations/me used to) and loading the first and last page of --limit rows.
+
+    python -m benchmarks.bench_history_pagination --histories 100 1000 10000 100000 --limit 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, desc, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.crud.translation_crud import AsyncTranslationCRUD
+from src.database import Base
+from src.models import auth_models  # noqa: F401, creates the users table the translations refer to
+from src.models.translation_models import Translation
+
+
+async def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1e3
+
+
+async def measure(db_path, histories, limit, repeat):
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    try:
+        async with AsyncSession(async_engine) as db:
+            crud = AsyncTranslationCRUD(db)
+            for user_id, length in enumerate(histories, 1):
+                full = await best_of(repeat, lambda: db.scalars(
+                    select(Translation).where(Translation.user_id == user_id).order_by(desc(Translation.id))))
+                first = await best_of(repeat, lambda: crud.get_translations_page_by_user_id(user_id, limit))
+                last_after_id = await db.scalar(select(Translation.id).where(Translation.user_id == user_id)
+                                                .order_by(Translation.id).offset(limit).limit(1))
+                last = await best_of(repeat, lambda: crud.get_translations_page_by_user_id(user_id, limit,
+                                                                                           last_after_id))
+                db.expunge_all()
+                print(f"history {length:>7}  full load {full:9.2f} ms  first page {first:6.2f} ms  "
+                      f"last page {last:6.2f} ms")
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--histories", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "history.db")
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(engine)
+
+        # Interleave the users' rows, like histories that grew over the same period.
+        now = datetime.now()
+        rows = [{"user_id": user_id, "video_url": "https://storage.googleapis.com/bucket/videos/0",
+                 "translation_text": "Saya", "date_time_created": now}
+                for i in range(max(args.histories))
+                for user_id, length in enumerate(args.histories, 1) if i < length]
+        with engine.begin() as connection:
+            connection.execute(Translation.__table__.insert(), rows)
+
+        engine.dispose()
+
+        asyncio.run(measure(db_path, args.histories, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Throughput of concurrent translation requests against the size of the Holistic pool.
+
+Every request runs MLServices.do_translation on the same synthetic clip from its own thread, the way
+FastAPI's threadpool runs concurrent uploads.
+
+    python -m benchmarks.bench_holistic_pool --pool-sizes 1 2 4 --concurrency 4 --requests 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import UploadFile
+
+from benchmarks.synthetic import write_synthetic_video
+from src.services.cache_services import FeatureCache
+from src.services.ml_services import MLServices, HolisticPool
+
+
+def translate(video_path, pool):
+    service = MLServices()
+    service.holistic_pool = pool
+    # Every request landmarks the clip again instead of reading the features of the first one.
+    service.feature_cache = FeatureCache(0)
+    with open(video_path, "rb") as f:
+        return service.do_translation(UploadFile(file=f, filename="video.mp4"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        video_path = write_synthetic_video(os.path.join(directory, "video.mp4"), args.width, args.height,
+                                           seconds=args.seconds)
+        print(f"cpus: {os.cpu_count()}, concurrency: {args.concurrency}, requests: {args.requests}")
+
+        for size in args.pool_sizes:
+            pool = HolisticPool(size, **MLServices().holistic_pool.holistic_options)
+            # Build the graphs up front so the measurement does not include their construction.
+            with ThreadPoolExecutor(size) as executor:
+                list(executor.map(lambda _: translate(video_path, pool), range(size)))
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.concurrency) as executor:
+                list(executor.map(lambda _: translate(video_path, pool), range(args.requests)))
+            elapsed = time.perf_counter() - start
+
+            print(f"pool size {size}: {args.requests / elapsed:6.2f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Startup cost of the API process: import time and resident memory, with and without the ML warm-up.
+
+Each measurement runs in a fresh interpreter.
+
+    python -m benchmarks.bench_import_time --repeat 3
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+SNIPPETS = {
+    "import src.services.ml_services": "import src.services.ml_services",
+    "import src.main": "import src.main",
+    "import src.main + warm-up": "import src.main; src.main.ServiceContainer.create().ml_service.warm_up()",
+}
+
+MEASURE = """
+import json, resource, time
+start = time.perf_counter()
+{snippet}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+
+def measure(snippet):
+    output = subprocess.run([sys.executable, "-c", MEASURE.format(snippet=snippet)], check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, snippet in SNIPPETS.items():
+        runs = [measure(snippet) for _ in range(args.repeat)]
+        seconds = min(run["seconds"] for run in runs)
+        rss = min(run["max_rss_mb"] for run in runs)
+        print(f"{name:<30} {seconds:6.2f} s {rss:8.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Per-window latency, resident memory and argmax agreement of the classifier inference backends.
+
+Every backend runs in a fresh interpreter so its resident memory is measured on its own. The test set
+is a .npy file of (n, 30, 258) windows, or random windows when none is given.
+
+    python -m benchmarks.bench_inference_backends --windows 256 --batch-size 32
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import os
+
+import numpy as np
+
+from src.services.ml_services import WINDOW_SIZE, FEATURES_PER_FRAME
+
+BACKENDS = [("keras", "none"), ("tflite", "none"), ("tflite", "float16"), ("tflite", "dynamic")]
+
+RUN_BACKEND = """
+import json, resource, sys, time
+import numpy as np
+from src.services.inference_services import load_backend
+from src.services.ml_services import model_path, MODEL_VERSION
+
+backend_name, quantization, windows_path, batch_size, cache_dir = sys.argv[1:]
+windows = np.load(windows_path)
+batch_size = int(batch_size)
+
+start = time.perf_counter()
+backend = load_backend(model_path, MODEL_VERSION, backend_name, quantization, cache_dir)
+backend.predict_on_batch(windows[:batch_size])
+load_seconds = time.perf_counter() - start
+
+start = time.perf_counter()
+results = [backend.predict_on_batch(windows[i:i + batch_size]) for i in range(0, len(windows), batch_size)]
+elapsed = time.perf_counter() - start
+
+single = []
+for window in windows[:64]:
+    start = time.perf_counter()
+    backend.predict_on_batch(window[np.newaxis])
+    single.append(time.perf_counter() - start)
+
+np.save(sys.argv[3] + "." + backend_name + "-" + quantization + ".npy", np.concatenate(results).argmax(axis=1))
+print(json.dumps({
+    "load_seconds": load_seconds,
+    "batched_ms_per_window": elapsed / len(windows) * 1e3,
+    "single_window_ms": float(np.median(single) * 1e3),
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--windows", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--test-set", help="A .npy file of (n, 30, 258) float32 windows.")
+    args = parser.parse_args()
+
+    if args.test_set:
+        windows = np.load(args.test_set).astype(np.float32)
+    else:
+        windows = np.random.default_rng(0).normal(0, 0.2, (args.windows, WINDOW_SIZE, FEATURES_PER_FRAME))
+        windows = windows.astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as directory:
+        windows_path = os.path.join(directory, "windows.npy")
+        np.save(windows_path, windows)
+
+        print(f"{'backend':<18} {'load':>7} {'batched/window':>15} {'single window':>14} {'rss':>8} {'agreement':>10}")
+        reference = None
+        for backend, quantization in BACKENDS:
+            output = subprocess.run(
+                [sys.executable, "-c", RUN_BACKEND, backend, quantization, windows_path, str(args.batch_size),
+                 directory],
+                check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            indexes = np.load(f"{windows_path}.{backend}-{quantization}.npy")
+            if reference is None:
+                reference = indexes
+
+            print(f"{backend + '/' + quantization:<18} {result['load_seconds']:6.2f}s "
+                  f"{result['batched_ms_per_window']:12.3f} ms {result['single_window_ms']:11.3f} ms "
+                  f"{result['max_rss_mb']:5.0f} MB {np.mean(indexes == reference):>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
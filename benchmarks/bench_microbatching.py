@@ -0,0 +1,75 @@
+"""Classifier throughput and latency of concurrent translations, with and without the shared inference scheduler.
+
+Every simulated translation submits one window at a time, with a pause standing in for landmarking the
+next 30 frames, from its own thread.
+
+    python -m benchmarks.bench_microbatching --concurrency 1 4 8 --windows 20 --landmark-ms 20
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from src.services.batching_services import InferenceScheduler, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_DELAY_MS
+from src.services.ml_services import MLServices, WINDOW_SIZE, FEATURES_PER_FRAME
+
+
+def translate(predict, windows, landmark_seconds, latencies):
+    for window in windows:
+        time.sleep(landmark_seconds)
+        start = time.perf_counter()
+        predict(window[np.newaxis])
+        latencies.append(time.perf_counter() - start)
+
+
+def run(concurrency, predict, windows, landmark_seconds, producer=None):
+    latencies = []
+
+    def worker():
+        if producer is None:
+            translate(predict, windows, landmark_seconds, latencies)
+            return
+        with producer():
+            translate(predict, windows, landmark_seconds, latencies)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return concurrency * len(windows) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--windows", type=int, default=20)
+    parser.add_argument("--landmark-ms", type=float, default=20)
+    parser.add_argument("--max-size", type=int, default=MICROBATCH_MAX_SIZE)
+    parser.add_argument("--max-delay-ms", type=float, default=MICROBATCH_MAX_DELAY_MS)
+    args = parser.parse_args()
+
+    model = MLServices().model
+    windows = np.random.default_rng(0).random((args.windows, WINDOW_SIZE, FEATURES_PER_FRAME), dtype=np.float32)
+    # Keras traces the model again for the first two batch shapes; keep that out of the measurements.
+    model.predict_on_batch(windows[:1])
+    model.predict_on_batch(windows[:2])
+    landmark_seconds = args.landmark_ms / 1000
+
+    for concurrency in args.concurrency:
+        scheduler = InferenceScheduler(args.max_size, args.max_delay_ms)
+        for name, predict, producer in (
+                ("direct", model.predict_on_batch, None),
+                ("scheduled", lambda batch: scheduler.predict(model, batch), scheduler.producer)):
+            throughput, p50, p99 = run(concurrency, predict, windows, landmark_seconds, producer)
+            print(f"concurrency {concurrency:<3} {name:<10} {throughput:8.1f} windows/s  "
+                  f"p50 {p50 * 1e3:7.1f} ms  p99 {p99 * 1e3:7.1f} ms")
+        stats = scheduler.stats()
+        print(f"{'':<16}mean scheduled batch: {stats['windows'] / max(stats['batches'], 1):.1f} windows")
+
+
+if __name__ == "__main__":
+    main()
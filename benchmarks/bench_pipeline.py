@@ -0,0 +1,306 @@
+"""Benchmark suite of the translation pipeline on recorded or synthetic videos, stage by stage and end to end.
+
+Measures the given videos, or when there are none one synthetic video per combination of --resolutions,
+--fps and --seconds, with the MLServices of the current tree and its landmark profile:
+
+  decode      reading the frames (MLServices._get_frames), per frame
+  landmark    Holistic detection including downscaling and colour conversion, per frame
+  features    building the feature row from the Holistic results, per frame
+  inference   classifying the windows in batches of PREDICT_BATCH_SIZE, per batch
+  end_to_end  MLServices.do_translation with an empty feature cache, per video, --repeat times
+
+Every stage reports its throughput, latency percentiles and the peak resident memory of the process while
+it ran. The results are written to --output as JSON; --compare prints the change against an earlier run.
+
+Holistic finds no person in the synthetic videos, so with them the landmark stage only times missed
+detections and the features stage empty rows. Every case records the frames with any landmarks and fails
+when there are none; pass recorded sign videos for representative numbers.
+
+    python -m benchmarks.bench_pipeline samples/*.mp4 --output pipeline.json
+    python -m benchmarks.bench_pipeline --resolutions 320x240 640x480 1280x720 --fps 15 30 --seconds 2 6 \\
+        --output pipeline.json
+    python -m benchmarks.bench_pipeline --output pipeline-new.json --compare pipeline.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+from fastapi import UploadFile
+
+from benchmarks.synthetic import write_synthetic_video
+from src.services.cache_services import FeatureCache
+from src.services.ml_services import MLServices, WINDOW_SIZE, FEATURES_PER_FRAME
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+class PeakMemory:
+    """Samples the resident set size of the process on a thread, keeping the highest value seen."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def rss_bytes() -> int:
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * PAGE_SIZE
+        except OSError:
+            # No procfs: the high-water mark of the whole process, it never goes down.
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def __enter__(self):
+        self.peak_bytes = self.rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self.rss_bytes())
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, self.rss_bytes())
+
+
+def summarize(latencies, items, elapsed, peak_memory):
+    """`latencies` in seconds per measured unit, `items` the frames or windows processed in `elapsed` seconds."""
+    latencies_ms = np.asarray(latencies) * 1e3
+    return {
+        "units": len(latencies),
+        "items": items,
+        "seconds": elapsed,
+        "items_per_second": items / elapsed if elapsed else None,
+        "latency_ms": {
+            "mean": float(latencies_ms.mean()) if len(latencies_ms) else None,
+            **{f"p{p}": float(np.percentile(latencies_ms, p)) if len(latencies_ms) else None
+               for p in (50, 90, 95, 99)},
+            "max": float(latencies_ms.max()) if len(latencies_ms) else None,
+        },
+        "peak_rss_mb": peak_memory.peak_bytes / 2 ** 20,
+    }
+
+
+def timed_frames(service, path):
+    """Yields the decoded frames of `path` with the time each took to decode."""
+    cap = cv2.VideoCapture(path)
+    try:
+        frames = service._get_frames(cap)
+        while True:
+            start = time.perf_counter()
+            frame = next(frames, None)
+            elapsed = time.perf_counter() - start
+            if frame is None:
+                return
+            yield frame, elapsed
+    finally:
+        cap.release()
+
+
+def measure_decode(service, path):
+    latencies = []
+    with PeakMemory() as peak_memory:
+        for _, elapsed in timed_frames(service, path):
+            latencies.append(elapsed)
+    return summarize(latencies, len(latencies), sum(latencies), peak_memory)
+
+
+def measure_landmarks(service, path):
+    """
+    Runs Holistic and the feature building frame by frame and returns both measurements, the features and
+    the number of frames Holistic found any landmarks in.
+    """
+    landmark_latencies, feature_latencies = [], []
+    rows = []
+    landmarked_frames = 0
+    with service.holistic_pool.checkout() as holistic, PeakMemory() as peak_memory:
+        for frame, _ in timed_frames(service, path):
+            start = time.perf_counter()
+            _, results = service._mediapipe_detection(frame, holistic)
+            landmarked = time.perf_counter()
+            if results.pose_landmarks or results.left_hand_landmarks or results.right_hand_landmarks:
+                landmarked_frames += 1
+            row = np.zeros(FEATURES_PER_FRAME, dtype=np.float32)
+            service._extract_landmarks(results, row)
+            landmark_latencies.append(landmarked - start)
+            feature_latencies.append(time.perf_counter() - landmarked)
+            rows.append(row)
+
+    features = np.array(rows, dtype=np.float32).reshape(-1, FEATURES_PER_FRAME)
+    return (summarize(landmark_latencies, len(rows), sum(landmark_latencies), peak_memory),
+            summarize(feature_latencies, len(rows), sum(feature_latencies), peak_memory),
+            features, landmarked_frames)
+
+
+def measure_inference(service, features):
+    n_windows = len(features) // WINDOW_SIZE
+    windows = features[:n_windows * WINDOW_SIZE].reshape(n_windows, WINDOW_SIZE, FEATURES_PER_FRAME)
+    latencies = []
+    with PeakMemory() as peak_memory:
+        for start in range(0, n_windows, service.batch_size):
+            batch = windows[start:start + service.batch_size]
+            batch_start = time.perf_counter()
+            service.model.predict_on_batch(batch)
+            latencies.append(time.perf_counter() - batch_start)
+    return summarize(latencies, n_windows, sum(latencies), peak_memory)
+
+
+def measure_end_to_end(service, path, repeat):
+    latencies = []
+    with PeakMemory() as peak_memory:
+        for _ in range(repeat):
+            # A fresh, disabled feature cache, so every run decodes and landmarks again.
+            service.feature_cache = FeatureCache(0)
+            with open(path, "rb") as video:
+                start = time.perf_counter()
+                service.do_translation(UploadFile(file=video, size=os.path.getsize(path)))
+                latencies.append(time.perf_counter() - start)
+    cap = cv2.VideoCapture(path)
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) * repeat
+    cap.release()
+    return summarize(latencies, frames, sum(latencies), peak_memory)
+
+
+def video_info(path):
+    cap = cv2.VideoCapture(path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        return {"name": os.path.basename(path), "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), "fps": fps,
+                "seconds": cap.get(cv2.CAP_PROP_FRAME_COUNT) / fps if fps else None,
+                "bytes": os.path.getsize(path)}
+    finally:
+        cap.release()
+
+
+def run_case(service, path, repeat):
+    decode = measure_decode(service, path)
+    landmark, features_stage, features, landmarked_frames = measure_landmarks(service, path)
+    case = {
+        "video": {**video_info(path), "frames": decode["items"], "landmarked_frames": landmarked_frames},
+        "stages": {
+            "decode": decode,
+            "landmark": landmark,
+            "features": features_stage,
+            "inference": measure_inference(service, features),
+            "end_to_end": measure_end_to_end(service, path, repeat),
+        },
+    }
+    if not landmarked_frames:
+        case["error"] = "Holistic found no landmarks in any frame"
+    return case
+
+
+def synthetic_videos(directory, resolutions, fps_values, seconds_values):
+    for resolution in resolutions:
+        width, height = map(int, resolution.split("x"))
+        for fps in fps_values:
+            for seconds in seconds_values:
+                yield write_synthetic_video(os.path.join(directory, f"{width}x{height}-{fps}fps-{seconds}s.mp4"),
+                                            width=width, height=height, fps=fps, seconds=seconds)
+
+
+def case_key(case):
+    return case["video"]["name"]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print(f"{'video':<26} {'stage':<11} {'items/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+    for case in results["cases"]:
+        if "error" in case:
+            print(f"{case_key(case):<26} FAILED: {case['error']}")
+        for stage, result in case["stages"].items():
+            print(f"{case_key(case):<26} {stage:<11} {result['items_per_second'] or 0:9.1f} "
+                  f"{result['latency_ms']['p50'] or 0:9.2f} {result['latency_ms']['p99'] or 0:9.2f} "
+                  f"{result['peak_rss_mb']:8.0f}")
+
+
+def print_comparison(results, baseline):
+    """Prints the change of throughput and median latency per stage against `baseline`, positive is faster."""
+    print(f"\nagainst {baseline['meta'].get('commit')} from {baseline['meta'].get('date')}:")
+    baseline_cases = {case_key(case): case for case in baseline["cases"]}
+    for case in results["cases"]:
+        baseline_case = baseline_cases.get(case_key(case))
+        if baseline_case is None or "error" in case or "error" in baseline_case:
+            continue
+        for stage, result in case["stages"].items():
+            old = baseline_case["stages"].get(stage)
+            if not old or not old["items_per_second"] or not result["latency_ms"]["p50"]:
+                continue
+            throughput = result["items_per_second"] / old["items_per_second"] - 1
+            speed = old["latency_ms"]["p50"] / result["latency_ms"]["p50"] - 1
+            print(f"{case_key(case):<26} {stage:<11} throughput {throughput:+7.1%}  p50 speed {speed:+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("videos", nargs="*", help="recorded videos, synthetic ones are generated without any")
+    parser.add_argument("--resolutions", nargs="+", default=["320x240", "640x480", "1280x720"])
+    parser.add_argument("--fps", type=int, nargs="+", default=[15, 30])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[2, 6])
+    parser.add_argument("--repeat", type=int, default=3, help="end-to-end runs per video")
+    parser.add_argument("--output", default=f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json")
+    parser.add_argument("--compare", help="JSON written by an earlier run to compare against")
+    args = parser.parse_args()
+
+    service = MLServices()
+    service.warm_up()
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "profile": service.profile.name,
+            "pipelined": service.pipelined,
+            "batch_size": service.batch_size,
+            "repeat": args.repeat,
+        },
+        "cases": [],
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        videos = args.videos or synthetic_videos(directory, args.resolutions, args.fps, args.seconds)
+        for path in videos:
+            results["cases"].append(run_case(service, path, args.repeat))
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+
+    print_results(results)
+    print(f"\nwritten to {args.output}")
+    if args.compare:
+        with open(args.compare) as baseline:
+            print_comparison(results, json.load(baseline))
+
+    failed = [case_key(case) for case in results["cases"] if "error" in case]
+    if failed:
+        parser.exit(1, f"\nno landmarks in {', '.join(failed)}, their stages do not represent real videos\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark of the classifier calls made by MLServices._predict.
+
+Compares one Keras model.predict call per 30-frame window against batched calls on random features. Both
+run on the Keras model, whatever inference backend is configured.
+
+    python -m benchmarks.bench_predict --windows 20 --batch-size 32
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.services.inference_services import KerasBackend
+from src.services.ml_services import model_path, WINDOW_SIZE, FEATURES_PER_FRAME
+
+
+def per_window(model, windows):
+    return [np.argmax(model.predict(np.expand_dims(window, axis=0), verbose=0)[0]) for window in windows]
+
+
+def batched(model, windows, batch_size):
+    indexes = []
+    for start in range(0, len(windows), batch_size):
+        batch = windows[start:start + batch_size]
+        indexes.extend(np.argmax(model.predict_on_batch(batch), axis=1))
+    return indexes
+
+
+def best_of(repeat, fn, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--windows", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    model = KerasBackend(model_path).model
+    windows = np.random.default_rng(0).random((args.windows, WINDOW_SIZE, FEATURES_PER_FRAME), dtype=np.float32)
+
+    per_window_time, per_window_indexes = best_of(args.repeat, per_window, model, windows)
+    batched_time, batched_indexes = best_of(args.repeat, batched, model, windows, args.batch_size)
+
+    print(f"windows:          {args.windows}")
+    print(f"per-window calls: {per_window_time * 1e3:8.1f} ms")
+    print(f"batched calls:    {batched_time * 1e3:8.1f} ms (batch size {args.batch_size})")
+    print(f"speedup:          {per_window_time / batched_time:8.2f}x")
+    print(f"argmax agreement: {np.mean(np.array(per_window_indexes) == np.array(batched_indexes)):.2%}")
+
+
+if __name__ == "__main__":
+    main()
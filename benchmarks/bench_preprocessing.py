@@ -0,0 +1,56 @@
+"""Micro-benchmark of the per-frame landmark feature extraction done by MLServices._preprocessing.
+
+Compares the former list-based row building against the preallocated NumPy path on synthetic
+Holistic results, so MediaPipe itself is not part of the measurement.
+
+    python -m benchmarks.bench_preprocessing --frames 3000
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from src.services.ml_services import MLServices, FEATURES_PER_FRAME
+from tests.landmarks import HolisticResults, legacy_rows, make_landmarks
+
+
+def make_results(rng, n_frames):
+    results = []
+    for i in range(n_frames):
+        results.append(HolisticResults(
+            pose_landmarks=make_landmarks(rng, 33, with_visibility=True),
+            left_hand_landmarks=make_landmarks(rng, 21) if i % 3 else None,
+            right_hand_landmarks=make_landmarks(rng, 21) if i % 4 else None,
+        ))
+    return results
+
+
+def vectorized_rows(service, all_results):
+    features = np.zeros((len(all_results), FEATURES_PER_FRAME), dtype=np.float32)
+    for row, results in zip(features, all_results):
+        service._extract_landmarks(results, row)
+    return features
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    service = MLServices()
+    all_results = make_results(np.random.default_rng(0), args.frames)
+
+    assert legacy_rows(all_results).tobytes() == vectorized_rows(service, all_results).tobytes()
+
+    legacy = min(timeit.repeat(lambda: legacy_rows(all_results), number=1, repeat=args.repeat))
+    vectorized = min(timeit.repeat(lambda: vectorized_rows(service, all_results), number=1, repeat=args.repeat))
+
+    print(f"frames:     {args.frames}")
+    print(f"legacy:     {legacy / args.frames * 1e6:8.2f} us/frame")
+    print(f"vectorized: {vectorized / args.frames * 1e6:8.2f} us/frame")
+    print(f"speedup:    {legacy / vectorized:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Per-request setup cost of TranslationServices: clients built for every request versus shared ones.
+
+"per request" builds MLServices and the storage client for each request, as TranslationServices used to;
+"shared" takes them from the application's ServiceContainer. Only construction is measured: a fresh
+storage client also opens a new HTTPS connection (TLS handshake included) on its first upload, which
+comes on top.
+
+    python -m benchmarks.bench_request_setup --requests 200
+"""
+import argparse
+import time
+
+from src.services.container_services import ServiceContainer
+from src.services.ml_services import MLServices
+from src.services.storage_services import STORAGE_BACKEND, get_storage_service
+from src.services.translation_services import TranslationServices
+
+
+def per_request(db, requests):
+    for _ in range(requests):
+        services = ServiceContainer(MLServices(), get_storage_service(), upload_workers=1)
+        TranslationServices(db, services)
+        services.close()
+
+
+def shared(db, requests, services):
+    for _ in range(requests):
+        TranslationServices(db, services)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    services = ServiceContainer.create()
+    print(f"storage backend: {STORAGE_BACKEND}")
+    for name, run in (("per request", lambda: per_request(None, args.requests)),
+                      ("shared", lambda: shared(None, args.requests, services))):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12} {elapsed / args.requests * 1e6:10.1f} us per request")
+    services.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Upload throughput of a storage backend, offline by default.
+
+Uploads random files of each size from spooled temporary files the way Starlette receives them, and
+deletes them again. The local backend writes to a temporary directory; `--backend gcs` uses the configured
+bucket instead.
+
+    python -m benchmarks.bench_storage_upload --sizes-mb 1 16 64 --repeat 5
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+from fastapi import UploadFile
+
+from src.services.storage_services import LocalStorageServices
+
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+def spooled_upload(content):
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    spooled.write(content)
+    spooled.seek(0)
+    return UploadFile(file=spooled, size=len(content), filename="video.mp4", headers={"content-type": "video/mp4"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["local", "gcs"], default="local")
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--chunk-size-mb", type=float, default=8, help="resumable chunk size of the gcs backend")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.backend == "gcs":
+            from src.services.gcp_storage_services import GCPStorageServices
+
+            storage = GCPStorageServices(chunk_size=int(args.chunk_size_mb * 1024 * 1024))
+        else:
+            storage = LocalStorageServices(directory)
+
+        rng = np.random.default_rng(0)
+        for size_mb in args.sizes_mb:
+            content = rng.bytes(int(size_mb * 1024 * 1024))
+            timings = []
+            for _ in range(args.repeat):
+                upload = spooled_upload(content)
+                start = time.perf_counter()
+                video_url = storage.upload_file(upload)
+                timings.append(time.perf_counter() - start)
+                upload.file.close()
+                storage.delete_file(video_url)
+            best, median = min(timings), float(np.median(timings))
+            print(f"{args.backend} {size_mb:6.1f} MB  best {best * 1e3:8.1f} ms ({size_mb / best:8.1f} MB/s)  "
+                  f"median {median * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
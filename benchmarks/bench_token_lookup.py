@@ -0,0 +1,113 @@
+"""Token table at millions of rows: full JWTs indexed as is versus fixed-length digests, and the purge.
+
+Fills one scratch SQLite database per layout with --rows tokens, of which --live-fraction are still valid,
+and looks up random valid tokens. The digest layout is then purged of its expired rows with
+delete_expired_tokens and measured again.
+
+    python -m benchmarks.bench_token_lookup --rows 2000000 --lookups 5000
+"""
+import argparse
+import base64
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from src.crud.auth_crud import delete_expired_tokens, get_token_by_access_token, token_digest
+from src.models.auth_models import Token
+
+LegacyBase = declarative_base()
+
+
+class LegacyToken(LegacyBase):
+    __tablename__ = "tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, index=True)
+    access_token = Column(String, index=True)
+
+
+def fake_jwt(rng):
+    # Same length and alphabet as the tokens create_access_token issues.
+    header = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9"
+    payload, signature = (base64.urlsafe_b64encode(rng.bytes(n)).rstrip(b"=").decode() for n in (112, 32))
+    return f"{header}.{payload}.{signature}"
+
+
+def fill(legacy_engine, digest_engine, rows, live_fraction, batch_size, rng):
+    live_tokens = []
+    now = datetime.now()
+    with legacy_engine.begin() as legacy, digest_engine.begin() as digest:
+        for start in range(0, rows, batch_size):
+            batch = [fake_jwt(rng) for _ in range(min(batch_size, rows - start))]
+            live = rng.random(len(batch)) < live_fraction
+            live_tokens.extend(token for token, is_live in zip(batch, live) if is_live)
+            legacy.execute(LegacyToken.__table__.insert(),
+                           [{"user_id": i, "access_token": t} for i, t in enumerate(batch, start)])
+            digest.execute(Token.__table__.insert(),
+                           [{"user_id": i, "token_digest": token_digest(t),
+                             "expires_at": now + timedelta(minutes=30 if is_live else -30)}
+                            for i, (t, is_live) in enumerate(zip(batch, live), start)])
+    return live_tokens
+
+
+def measure(lookup, tokens, lookups, rng):
+    latencies = []
+    for token in rng.choice(tokens, size=lookups):
+        start = time.perf_counter()
+        assert lookup(token) is not None
+        latencies.append(time.perf_counter() - start)
+    return np.percentile(latencies, 50) * 1e6, np.percentile(latencies, 99) * 1e6
+
+
+def report(name, latencies, db_path):
+    print(f"{name:<22} p50 {latencies[0]:7.1f} us  p99 {latencies[1]:7.1f} us  "
+          f"database {os.path.getsize(db_path) / 1e6:6.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--live-fraction", type=float, default=0.01)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--purge-batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path, digest_path = os.path.join(directory, "legacy.db"), os.path.join(directory, "digest.db")
+        legacy_engine = create_engine(f"sqlite:///{legacy_path}")
+        digest_engine = create_engine(f"sqlite:///{digest_path}")
+        LegacyBase.metadata.create_all(legacy_engine)
+        Token.__table__.create(digest_engine)
+
+        rng = np.random.default_rng(0)
+        start = time.perf_counter()
+        tokens = fill(legacy_engine, digest_engine, args.rows, args.live_fraction, args.batch_size, rng)
+        print(f"filled {args.rows} rows per layout ({len(tokens)} valid) in {time.perf_counter() - start:.0f} s")
+
+        with Session(legacy_engine) as db:
+            report("full token index", measure(
+                lambda t: db.query(LegacyToken).filter(LegacyToken.access_token == t).first(),
+                tokens, args.lookups, rng), legacy_path)
+
+        with Session(digest_engine) as db:
+            report("digest index", measure(lambda t: get_token_by_access_token(db, t), tokens, args.lookups, rng),
+                   digest_path)
+
+            start = time.perf_counter()
+            deleted = delete_expired_tokens(db, datetime.now(), args.purge_batch_size)
+            print(f"purged {deleted} expired rows in {time.perf_counter() - start:.1f} s")
+            with digest_engine.connect() as connection:
+                connection.exec_driver_sql("VACUUM")
+
+            report("digest index, purged", measure(lambda t: get_token_by_access_token(db, t), tokens,
+                                                   args.lookups, rng), digest_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Bytes copied and Python memory spent to hand an upload to the video decoder, before and after
+opening spooled uploads in place.
+
+The upload is wrapped in a SpooledTemporaryFile the way Starlette receives it; each variant then opens it
+with cv2.VideoCapture and decodes the first frame.
+
+    python -m benchmarks.bench_video_source --seconds 10 --width 1280 --height 720
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+from fastapi import UploadFile
+
+from benchmarks.synthetic import write_synthetic_video
+from src.services.ml_services import MLServices, video_source_stats
+
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+def legacy(upload):
+    """The former MLServices._save_file_tmp: read the whole upload, write it to a temporary file."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp_file:
+        content = upload.file.read()
+        temp_file.write(content)
+    upload.file.seek(0)
+    try:
+        decode_first_frame(temp_file.name)
+    finally:
+        os.remove(temp_file.name)
+    return len(content)
+
+
+def in_place(upload):
+    before = video_source_stats.stats()["bytes_copied"]
+    with MLServices()._video_path(upload) as path:
+        decode_first_frame(path)
+    return video_source_stats.stats()["bytes_copied"] - before
+
+
+def decode_first_frame(path):
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.read()[0]:
+            raise RuntimeError(f"Could not decode {path}.")
+    finally:
+        cap.release()
+
+
+def spooled_upload(video_path):
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    with open(video_path, "rb") as f:
+        spooled.write(f.read())
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename="video.mp4")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        video_path = write_synthetic_video(os.path.join(directory, "video.mp4"), args.width, args.height,
+                                           seconds=args.seconds)
+        print(f"upload: {os.path.getsize(video_path) / 1e6:.1f} MB")
+
+        for name, variant in (("legacy", legacy), ("in place", in_place)):
+            upload = spooled_upload(video_path)
+            tracemalloc.start()
+            start = time.perf_counter()
+            copied = variant(upload)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            upload.file.close()
+            print(f"{name:<10} copied {copied / 1e6:7.1f} MB  peak python memory {peak / 1e6:7.1f} MB  "
+                  f"{elapsed * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Latency and prediction agreement of the landmark profiles against the accurate profile.
+
+Runs every video through MLServices with each profile and reports the mean latency per video and the
+share of windows whose predicted word matches the one predicted with the accurate profile. The videos
+have to be recorded signing: Holistic finds no landmarks in the synthetic clips of the benchmarks, every
+profile would agree on them. Each profile is warmed up before its videos are timed.
+
+    python -m benchmarks.evaluate_profiles --profiles accurate fast samples/*.mp4
+"""
+import argparse
+import io
+import os
+import time
+from contextlib import redirect_stdout
+
+from fastapi import UploadFile
+
+from src.services.cache_services import FeatureCache
+from src.services.ml_services import MLServices, LANDMARK_PROFILES, LandmarkProfile
+
+
+def create_service(profile):
+    service = MLServices(profile)
+    # A disabled feature cache of its own: the process-wide one would serve the accurate profile's features
+    # from the reference pass.
+    service.feature_cache = FeatureCache(0)
+    # Builds the profile's Holistic graph, otherwise the first timed video pays for it.
+    service.warm_up()
+    return service
+
+
+def translate(service, video_path):
+    with open(video_path, "rb") as f, redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        words = service.do_translation(UploadFile(file=f, filename=os.path.basename(video_path))).split()
+        return time.perf_counter() - start, words
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("videos", nargs="+", help="recorded sign videos")
+    parser.add_argument("--profiles", nargs="+", default=list(LANDMARK_PROFILES))
+    parser.add_argument("--frame-stride", type=int, help="Overrides the frame stride of the compared profiles.")
+    args = parser.parse_args()
+
+    profiles = [LANDMARK_PROFILES[name] for name in args.profiles]
+    if args.frame_stride:
+        profiles = [LandmarkProfile(f"{p.name}/stride {args.frame_stride}", p.model_complexity, p.max_resolution,
+                                    args.frame_stride) for p in profiles]
+    reference = LANDMARK_PROFILES["accurate"]
+
+    reference_service = create_service(reference)
+    reference_words = {video: translate(reference_service, video)[1] for video in args.videos}
+
+    print(f"{'profile':<24} {'latency/video':>14} {'agreement':>10}")
+    for profile in profiles:
+        service = create_service(profile)
+        latencies, matches, windows = [], 0, 0
+        for video in args.videos:
+            latency, words = translate(service, video)
+            latencies.append(latency)
+            expected = reference_words[video]
+            matches += sum(a == b for a, b in zip(words, expected))
+            windows += max(len(words), len(expected))
+
+        agreement = matches / windows if windows else 1.0
+        print(f"{profile.name:<24} {sum(latencies) / len(latencies) * 1e3:11.0f} ms {agreement:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Concurrent request capacity of the sync database path (threadpool) versus the async one (event loop).
+
+Serves a scratch app with one history endpoint per path, both running a page query preceded by a simulated
+slow statement that waits --query-ms inside the database driver. --clients clients call each endpoint in
+turn for --seconds. Sync endpoints hold a threadpool thread (40 by default) for the whole wait; async
+ones only hold a pooled connection. Both connection pools are sized to --clients.
+
+    python -m benchmarks.load_async_db --clients 200 --query-ms 50 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+import numpy as np
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, desc, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.crud.translation_crud import AsyncTranslationCRUD
+from src.database import Base
+from src.models import auth_models  # noqa: F401, creates the users table the translations refer to
+from src.models.translation_models import Translation
+
+
+def sleep_ms(ms):
+    time.sleep(ms / 1000)
+    return ms
+
+
+def create_app(db_path, pool_size, query_ms):
+    engine = create_engine(f"sqlite:///{db_path}", pool_size=pool_size, max_overflow=0,
+                           connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", pool_size=pool_size, max_overflow=0)
+    for target in (engine, async_engine.sync_engine):
+        # Runs on the driver's thread, for aiosqlite that is the connection's own thread.
+        event.listen(target, "connect", lambda connection, _: connection.create_function("sleep_ms", 1, sleep_ms))
+
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(Translation(user_id=1, video_url="url", translation_text="Saya", date_time_created=datetime.now())
+                   for _ in range(100))
+        db.commit()
+
+    session_factory = sessionmaker(bind=engine)
+    async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def get_db():
+        with session_factory() as db:
+            yield db
+
+    async def get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_history(db: Session = Depends(get_db)):
+        db.execute(text("SELECT sleep_ms(:ms)"), {"ms": query_ms})
+        # The page query of AsyncTranslationCRUD.get_translations_page_by_user_id on the sync session.
+        return db.query(Translation).filter(Translation.user_id == 1).order_by(desc(Translation.id)).limit(50).all()
+
+    @app.get("/async")
+    async def async_history(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(text("SELECT sleep_ms(:ms)"), {"ms": query_ms})
+        return (await AsyncTranslationCRUD(db).get_translations_page_by_user_id(1, 50))[0]
+
+    return app, engine, async_engine
+
+
+async def client_loop(client, path, deadline, latencies, statuses):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def run(args, app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app", timeout=60) as client:
+        for path in ("/sync", "/async"):
+            latencies, statuses = [], {}
+            deadline = time.perf_counter() + args.seconds
+            await asyncio.gather(*(client_loop(client, path, deadline, latencies, statuses)
+                                   for _ in range(args.clients)))
+            print(f"{path:<7} {len(latencies) / args.seconds:8.1f} req/s  "
+                  f"p50 {np.percentile(latencies, 50) * 1e3:8.1f} ms  "
+                  f"p99 {np.percentile(latencies, 99) * 1e3:8.1f} ms  status {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--query-ms", type=float, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app, engine, async_engine = create_app(os.path.join(directory, "history.db"), args.clients, args.query_ms)
+        try:
+            asyncio.run(run(args, app))
+        finally:
+            engine.dispose()
+            asyncio.run(async_engine.dispose())
+
+
+if __name__ == "__main__":
+    main()
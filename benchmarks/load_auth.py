@@ -0,0 +1,76 @@
+"""Load test of logins running next to ordinary authenticated requests.
+
+Runs the app in-process (or against --url), with --logins clients logging in back to back while
+--readers clients fetch their user through /api/v1/auth/me. Reports login throughput and the latency of
+both; non-2xx responses are reported as failures, they time an error path. Point DB_URL at a scratch
+database; the test registers its own user.
+
+    DB_URL=sqlite:////tmp/load.db STORAGE_BACKEND=local python -m benchmarks.load_auth --seconds 20
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+import numpy as np
+
+
+async def client_loop(client, request, deadline, latencies, statuses):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await request(client)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+def report(name, latencies, statuses, seconds):
+    failures = sum(count for status, count in statuses.items() if not 200 <= status < 300)
+    print(f"{name:<8} {len(latencies) / seconds:8.1f} req/s  p50 {np.percentile(latencies, 50) * 1e3:8.1f} ms  "
+          f"p99 {np.percentile(latencies, 99) * 1e3:8.1f} ms  status {statuses}")
+    if failures:
+        print(f"{name:<8} FAILED: {failures} of {len(latencies)} responses were not 2xx")
+
+
+async def run(args):
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        from src.main import app
+
+        transport, base_url = httpx.ASGITransport(app=app), "http://app"
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        credentials = {"username": f"load-{uuid.uuid4().hex[:12]}", "password": "secretpassword123"}
+        await client.post("/api/v1/auth/register", json={**credentials, "confirm_password": credentials["password"]})
+        token = (await client.post("/api/v1/auth/login", data=credentials)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def login(c):
+            return await c.post("/api/v1/auth/login", data=credentials)
+
+        async def read(c):
+            return await c.get("/api/v1/auth/me", headers=headers)
+
+        login_latencies, login_statuses, read_latencies, read_statuses = [], {}, [], {}
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            *(client_loop(client, login, deadline, login_latencies, login_statuses) for _ in range(args.logins)),
+            *(client_loop(client, read, deadline, read_latencies, read_statuses) for _ in range(args.readers)),
+        )
+
+    report("login", login_latencies, login_statuses, args.seconds)
+    report("me", read_latencies, read_statuses, args.seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server; the app runs in-process otherwise")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--readers", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+-- Stores tokens by their SHA-256 digest with an expiry instead of the token itself.
+-- Existing tokens cannot be converted, they are dropped and their users have to log in again.
+-- PostgreSQL; run once against databases created before the tokens table had token_digest.
+BEGIN;
+
+DELETE FROM tokens;
+DROP INDEX IF EXISTS ix_tokens_access_token;
+ALTER TABLE tokens DROP COLUMN access_token;
+ALTER TABLE tokens ADD COLUMN token_digest VARCHAR(64);
+ALTER TABLE tokens ADD COLUMN expires_at TIMESTAMP WITHOUT TIME ZONE;
+CREATE UNIQUE INDEX ix_tokens_token_digest ON tokens (token_digest);
+CREATE INDEX ix_tokens_expires_at ON tokens (expires_at);
+
+COMMIT;
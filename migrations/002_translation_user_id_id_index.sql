@@ -0,0 +1,9 @@
+-- Replaces the index on translation.user_id with one on (user_id, id), which serves a user's history
+-- newest first, page by page, without sorting. PostgreSQL; run once against databases created before
+-- the translation table had ix_translation_user_id_id.
+BEGIN;
+
+CREATE INDEX ix_translation_user_id_id ON translation (user_id, id);
+DROP INDEX IF EXISTS ix_translation_user_id;
+
+COMMIT;
@@ -1,12 +1,16 @@
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..schemas import auth_schemas
 from ..models import auth_models
-from ..utils import pwd_context
+from ..services.cache_services import principal_cache
 
 
-def create_user(db: Session, user: auth_schemas.UserCreate):
-    hashed_password = pwd_context.hash(user.password)
+def create_user(db: Session, user: auth_schemas.UserCreate, hashed_password: str):
     db_user = auth_models.User(username=user.username, password=hashed_password)
     db.add(db_user)
     db.commit()
@@ -22,8 +26,18 @@ def get_user_by_username(db: Session, username: str):
     return db.query(auth_models.User).filter(auth_models.User.username == username).first()
 
 
+async def get_user_by_username_async(db: AsyncSession, username: str):
+    return await db.scalar(select(auth_models.User).where(auth_models.User.username == username).limit(1))
+
+
+def update_user_password(db: Session, user_id: int, hashed_password: str):
+    db.query(auth_models.User).filter(auth_models.User.id == user_id).update({"password": hashed_password})
+    db.commit()
+
+
 def save_token(db: Session, token: auth_schemas.TokenCreate):
-    token = auth_models.Token(user_id=token.user_id, access_token=token.access_token)
+    token = auth_models.Token(user_id=token.user_id, token_digest=token_digest(token.access_token),
+                              expires_at=token.expires_at)
     db.add(token)
     db.commit()
 
@@ -37,9 +51,40 @@ def get_token_by_user_id(db: Session, user_id: int):
 
 
 def get_token_by_access_token(db: Session, access_token: str):
-    return db.query(auth_models.Token).filter(auth_models.Token.access_token == access_token).first()
+    return db.query(auth_models.Token).filter(auth_models.Token.token_digest == token_digest(access_token)).first()
+
+
+async def get_token_by_access_token_async(db: AsyncSession, access_token: str):
+    return await db.scalar(select(auth_models.Token)
+                           .where(auth_models.Token.token_digest == token_digest(access_token)).limit(1))
 
 
 def delete_tokens_by_user_id(db: Session, user_id: int):
     db.query(auth_models.Token).filter(auth_models.Token.user_id == user_id).delete()
     db.commit()
+    principal_cache.invalidate_user(user_id)
+
+
+async def delete_tokens_by_user_id_async(db: AsyncSession, user_id: int):
+    await db.execute(delete(auth_models.Token).where(auth_models.Token.user_id == user_id))
+    await db.commit()
+    principal_cache.invalidate_user(user_id)
+
+
+def delete_expired_tokens(db: Session, now: datetime, batch_size: int) -> int:
+    """Deletes the tokens expired before `now`, `batch_size` rows per transaction. Returns the number deleted."""
+    deleted = 0
+    while True:
+        expired_ids = [token_id for token_id, in db.query(auth_models.Token.id)
+                       .filter(auth_models.Token.expires_at < now).limit(batch_size)]
+        if expired_ids:
+            db.query(auth_models.Token).filter(auth_models.Token.id.in_(expired_ids)) \
+                .delete(synchronize_session=False)
+            db.commit()
+            deleted += len(expired_ids)
+        if len(expired_ids) < batch_size:
+            return deleted
+
+
+def token_digest(access_token: str) -> str:
+    return hashlib.sha256(access_token.encode()).hexdigest()
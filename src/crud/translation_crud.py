@@ -1,5 +1,6 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, select
 
 from src.models.translation_models import Translation
 from src.schemas.translation_schemas import TranslationCreate, TranslationRead
@@ -31,10 +32,33 @@ class TranslationCRUD:
     def get_by_id(self, translation_id: int):
         return self.db.query(Translation).filter(Translation.id == translation_id).first()
 
-    def get_sorted_translations_by_user_id(self, user_id: int):
-        return self.db.query(Translation).filter(Translation.user_id == user_id).order_by(desc(Translation.id)).all()
-
     def update_translation(self, translation: Translation):
         self.db.commit()
         self.db.refresh(translation)
         return translation
+
+
+class AsyncTranslationCRUD:
+    """The reads and updates of TranslationCRUD on an AsyncSession, for endpoints running on the event loop."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, translation_id: int):
+        return await self.db.get(Translation, translation_id)
+
+    async def get_translations_page_by_user_id(self, user_id: int, limit: int, after_id: int | None = None):
+        """
+        Returns up to `limit` of the user's translations with an id below `after_id`, newest first, and
+        whether more follow. Runs a single query.
+        """
+        query = select(Translation).where(Translation.user_id == user_id)
+        if after_id is not None:
+            query = query.where(Translation.id < after_id)
+        translations = (await self.db.scalars(query.order_by(desc(Translation.id)).limit(limit + 1))).all()
+        return translations[:limit], len(translations) > limit
+
+    async def update_translation(self, translation: Translation):
+        await self.db.commit()
+        await self.db.refresh(translation)
+        return translation
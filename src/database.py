@@ -1,14 +1,69 @@
 import os
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from .services.pool_services import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
 DB_URL = os.environ.get("DB_URL")
 if not DB_URL:
     print("DB_URL env variable is not set.")
 
-engine = create_engine(DB_URL)
+# Per engine: the sync and the async engine keep separate pools, together they open up to twice as many.
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "-1"))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "false").lower() == "true"
+
+
+def async_db_url(db_url: str) -> str:
+    """Returns `db_url` with its driver swapped for the asyncio one of the same database."""
+    url = make_url(db_url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]).render_as_string(hide_password=False)
+
+
+# Set ASYNC_DB_URL when the derived one does not work, asyncpg takes no psycopg2-only query parameters.
+ASYNC_DB_URL = os.environ.get("ASYNC_DB_URL") or async_db_url(DB_URL)
+
+pool_options = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+engine = create_engine(DB_URL, poolclass=InstrumentedQueuePool, **pool_options)
+async_engine = create_async_engine(ASYNC_DB_URL, poolclass=InstrumentedAsyncAdaptedQueuePool, **pool_options)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay loaded after commit, lazy loading them again would need an await.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
+
+
+def check_schema(bind):
+    """
+    Raises when a table that already exists lacks columns or indexes of its model. create_all only creates
+    missing tables, an outdated one has to be migrated with the scripts in migrations/.
+    """
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing = [column.name for column in table.columns if column.name not in columns]
+        missing += [index.name for index in table.indexes if index.name not in indexes]
+        if missing:
+            raise RuntimeError(f"Table {table.name} lacks the columns or indexes {', '.join(missing)}, "
+                               f"run the scripts in migrations/ against the database.")
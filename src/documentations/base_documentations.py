@@ -8,3 +8,14 @@ not_authenticated_doc = {
         }
     }
 }
+
+service_busy_doc = {
+    "description": "Server is busy.",
+    "content": {
+        "application/json": {
+            "example": {
+                "detail": "Server is busy, please retry."
+            }
+        }
+    }
+}
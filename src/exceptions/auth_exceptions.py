@@ -0,0 +1,7 @@
+from fastapi import HTTPException, status
+
+
+def raise_password_service_busy_exception():
+    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail="Server is busy, please retry.",
+                        headers={"Retry-After": "1"})
@@ -0,0 +1,6 @@
+from fastapi import HTTPException, status
+
+
+def raise_internal_not_found_exception():
+    # Same response as an unknown route, the internal endpoints do not reveal themselves.
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
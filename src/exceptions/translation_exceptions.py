@@ -5,5 +5,13 @@ def raise_translation_not_found_exception():
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Translation not found.")
 
 
+def raise_translation_job_not_found_exception():
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Translation job not found.")
+
+
 def raise_forbidden_exception():
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access to this resource is not allowed.")
+
+
+def raise_invalid_cursor_exception():
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
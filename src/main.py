@@ -1,8 +1,20 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 
-from .database import engine
+from .database import engine, async_engine, check_schema
 from .models import auth_models
-from .routers import auth_routers, translation_routers
+from .routers import auth_routers, internal_routers, metrics_routers, translation_routers
+from .services.auth_services import purge_expired_tokens_periodically
+from .services.container_services import ServiceContainer
+from .services.job_services import translation_jobs
+from .services.password_services import password_hasher
+from .services.query_services import QueryCountMiddleware, query_metrics
+
+ML_WARMUP = os.environ.get("ML_WARMUP", "true").lower() == "true"
 
 tags_metadata = [
     {
@@ -12,8 +24,31 @@ tags_metadata = [
 ]
 
 auth_models.Base.metadata.create_all(bind=engine)
+check_schema(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.services = await run_in_threadpool(ServiceContainer.create)
+    # Load the model and build a Holistic graph before serving, so the first translation is not slow.
+    if ML_WARMUP:
+        await run_in_threadpool(app.state.services.ml_service.warm_up)
+    token_purge = asyncio.create_task(purge_expired_tokens_periodically())
+    yield
+    token_purge.cancel()
+    with suppress(asyncio.CancelledError):
+        await token_purge
+    # Let accepted translation jobs finish so their translations are stored.
+    await run_in_threadpool(translation_jobs.shutdown)
+    await run_in_threadpool(app.state.services.close)
+    await run_in_threadpool(password_hasher.shutdown)
+    await async_engine.dispose()
+
 
-app = FastAPI(title="Silang", openapi_tags=tags_metadata)
+app = FastAPI(title="Silang", openapi_tags=tags_metadata, lifespan=lifespan)
+app.add_middleware(QueryCountMiddleware, metrics=query_metrics)
 
 app.include_router(auth_routers.router)
 app.include_router(translation_routers.router)
+app.include_router(internal_routers.router)
+app.include_router(metrics_routers.router)
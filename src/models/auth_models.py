@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
 from ..database import Base
 
 
@@ -15,4 +15,6 @@ class Token(Base):
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
-    access_token = Column(String, index=True)
+    # SHA-256 hex digest of the access token; the token itself is not stored.
+    token_digest = Column(String(64), unique=True, index=True)
+    expires_at = Column(DateTime, index=True)
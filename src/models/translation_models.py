@@ -1,12 +1,14 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Index
 from ..database import Base
 
 
 class Translation(Base):
     __tablename__ = "translation"
+    # Serves a user's history newest first, page by page (see AsyncTranslationCRUD.get_translations_page_by_user_id).
+    __table_args__ = (Index("ix_translation_user_id_id", "user_id", "id"),)
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
     video_url = Column(String)
     translation_text = Column(String)
     date_time_created = Column(DateTime)
@@ -1,14 +1,17 @@
 from fastapi import Depends, HTTPException, status, APIRouter, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Annotated
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-from ..crud.auth_crud import get_user_by_username, create_user, save_token, delete_tokens_by_user_id
-from ..documentations.base_documentations import not_authenticated_doc
-from ..services.auth_services import authenticate_user, create_access_token, get_current_user
+from ..crud.auth_crud import create_user, save_token, delete_tokens_by_user_id_async
+from ..documentations.base_documentations import not_authenticated_doc, service_busy_doc
+from ..services.auth_services import authenticate_user, create_access_token, get_current_user, hash_password, \
+    get_user_credentials
 from ..schemas import auth_schemas
-from ..utils import get_db
+from ..utils import get_db, get_async_db
 
 router = APIRouter(
     prefix="/api/v1/auth",
@@ -59,8 +62,9 @@ router = APIRouter(
                          }
                      }
                  },
+                 503: service_busy_doc,
              })
-def register_user(
+async def register_user(
         user: Annotated[
             auth_schemas.UserCreate,
             Body(
@@ -73,7 +77,7 @@ def register_user(
         db: Session = Depends(get_db)
 ):
     """Username must be unique with minimal password length of 8 characters."""
-    existing_user = get_user_by_username(db, user.username)
+    existing_user, _ = await run_in_threadpool(get_user_credentials, db, user.username)
 
     if existing_user:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Username already exists.")
@@ -86,7 +90,8 @@ def register_user(
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                             detail="Password confirmation does not match.")
 
-    return create_user(db, user)
+    hashed_password = await hash_password(user.password)
+    return await run_in_threadpool(create_user, db, user, hashed_password)
 
 
 @router.post("/login",
@@ -112,12 +117,13 @@ def register_user(
                          }
                      }
                  },
+                 503: service_busy_doc,
              })
-def login_for_access_token(
+async def login_for_access_token(
         form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
         db: Session = Depends(get_db),
 ) -> auth_schemas.Token:
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -126,12 +132,13 @@ def login_for_access_token(
         )
 
     access_token_expires = timedelta(minutes=30)
+    expires_at = datetime.now() + access_token_expires
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
 
-    token_create = auth_schemas.TokenCreate(user_id=user.id, access_token=access_token)
-    save_token(db, token_create)
+    token_create = auth_schemas.TokenCreate(user_id=user.id, access_token=access_token, expires_at=expires_at)
+    await run_in_threadpool(save_token, db, token_create)
 
     return auth_schemas.Token(access_token=access_token, token_type="bearer")
 
@@ -150,8 +157,11 @@ def login_for_access_token(
                  },
                  401: not_authenticated_doc
              })
-def logout(current_user: Annotated[auth_schemas.UserRead, Depends(get_current_user)], db: Session = Depends(get_db)):
-    delete_tokens_by_user_id(db, current_user.id)
+async def logout(
+        current_user: Annotated[auth_schemas.UserRead, Depends(get_current_user)],
+        db: AsyncSession = Depends(get_async_db)
+):
+    await delete_tokens_by_user_id_async(db, current_user.id)
 
     return {"detail": "Logged out successfully."}
 
@@ -172,7 +182,7 @@ def logout(current_user: Annotated[auth_schemas.UserRead, Depends(get_current_us
                 },
                 401: not_authenticated_doc
             })
-def read_current_user(
+async def read_current_user(
         current_user: Annotated[auth_schemas.UserRead, Depends(get_current_user)],
 ):
     """
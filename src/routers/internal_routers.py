@@ -0,0 +1,36 @@
+import os
+import secrets
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header
+
+from ..database import engine, async_engine
+from ..exceptions.internal_exceptions import raise_internal_not_found_exception
+
+INTERNAL_API_TOKEN = os.environ.get("INTERNAL_API_TOKEN")
+
+
+def check_internal_token(x_internal_token: Annotated[str | None, Header()] = None):
+    """Lets requests through that send INTERNAL_API_TOKEN in X-Internal-Token. Without it set, none are."""
+    if not INTERNAL_API_TOKEN or not secrets.compare_digest((x_internal_token or "").encode(),
+                                                            INTERNAL_API_TOKEN.encode()):
+        raise_internal_not_found_exception()
+
+
+router = APIRouter(
+    prefix="/internal",
+    include_in_schema=False,
+    dependencies=[Depends(check_internal_token)],
+)
+
+
+@router.get("/pools")
+async def read_pool_stats():
+    """
+    Returns the live state of the database connection pools and their checkout counts and times since
+    start, in seconds.
+    """
+    return {
+        "sync": engine.pool.pool_stats(),
+        "async": async_engine.pool.pool_stats(),
+    }
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+from ..database import engine, async_engine
+from ..services.batching_services import inference_scheduler
+from ..services.cache_services import feature_cache, translation_cache, principal_cache
+from ..services.metrics_services import StatsCollector
+from ..services.ml_services import video_source_stats
+from ..services.password_services import password_hasher
+from ..services.query_services import query_metrics
+from .internal_routers import check_internal_token
+
+stats_collector = StatsCollector()
+stats_collector.add("cache", lambda: {"feature": feature_cache.stats(), "translation": translation_cache.stats(),
+                                      "principal": principal_cache.stats()}, label="cache")
+stats_collector.add("video_source", video_source_stats.stats)
+stats_collector.add("microbatch", inference_scheduler.stats)
+stats_collector.add("password_hasher", password_hasher.stats)
+stats_collector.add("db_pool", lambda: {"sync": engine.pool.pool_stats(), "async": async_engine.pool.pool_stats()},
+                    label="pool")
+stats_collector.add("db", query_metrics.stats, label="endpoint")
+REGISTRY.register(stats_collector)
+
+# Guarded like the internal endpoints: the scraper sends INTERNAL_API_TOKEN in X-Internal-Token.
+router = APIRouter(include_in_schema=False, dependencies=[Depends(check_internal_token)])
+
+
+@router.get("/metrics")
+def read_metrics():
+    """Returns the metrics of this process in the Prometheus text format."""
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
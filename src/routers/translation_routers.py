@@ -1,16 +1,23 @@
 from typing import Annotated
 
-from fastapi import APIRouter, UploadFile, Depends
+from fastapi import APIRouter, UploadFile, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..documentations.base_documentations import not_authenticated_doc
 from ..schemas import auth_schemas
-from ..schemas.translation_schemas import TranslationBase, TranslationRead, FeedbackUpdate
+from ..schemas.translation_schemas import TranslationBase, TranslationRead, FeedbackUpdate, TranslationJobRead
 from ..services.auth_services import get_current_user
+from ..services.container_services import ServiceContainer, get_services
+from ..services.job_services import translation_jobs
 from ..services.translation_services import TranslationServices
-from ..utils import get_db
-from ..crud.translation_crud import TranslationCRUD
-from ..exceptions.translation_exceptions import raise_translation_not_found_exception, raise_forbidden_exception
+from ..utils import get_db, get_async_db, encode_cursor, decode_cursor
+from ..crud.translation_crud import AsyncTranslationCRUD
+from ..exceptions.translation_exceptions import raise_translation_not_found_exception, raise_forbidden_exception, \
+    raise_translation_job_not_found_exception, raise_invalid_cursor_exception
+
+TRANSLATION_PAGE_SIZE = 50
+TRANSLATION_MAX_PAGE_SIZE = 100
 
 router = APIRouter(
     prefix="/api/v1/translations",
@@ -24,6 +31,12 @@ router = APIRouter(
     responses={
         200: {
             "description": "Succesfully retrieved translation history",
+            "headers": {
+                "X-Next-Cursor": {
+                    "description": "Pass as `after` to get the next page. Absent on the last page.",
+                    "schema": {"type": "string"}
+                }
+            },
             "content": {
                 "application/json": {
                     "example": [{
@@ -36,24 +49,47 @@ router = APIRouter(
                 }
             }
         },
+        400: {
+            "description": "Invalid cursor",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Invalid cursor."
+                    }
+                }
+            }
+        },
         401: not_authenticated_doc,
     }
 )
-def get_current_user_translations(
+async def get_current_user_translations(
         current_user: Annotated[auth_schemas.UserRead, Depends(get_current_user)],
-        db: Session = Depends(get_db)
+        response: Response,
+        limit: Annotated[int, Query(ge=1, le=TRANSLATION_MAX_PAGE_SIZE)] = TRANSLATION_PAGE_SIZE,
+        after: str | None = None,
+        db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Returns the current user's translations ordered by the most recent.
+    Returns the current user's translations ordered by the most recent, `limit` at a time. When more
+    follow, the `X-Next-Cursor` response header holds the cursor to pass as `after` for the next page.
     """
-    current_user_id = current_user.id
+    after_id = None
+    if after is not None:
+        try:
+            after_id = decode_cursor(after)
+        except ValueError:
+            raise_invalid_cursor_exception()
 
-    translation_crud = TranslationCRUD(db)
+    translation_crud = AsyncTranslationCRUD(db)
+    translations, has_more = await translation_crud.get_translations_page_by_user_id(current_user.id, limit, after_id)
 
-    if not translation_crud.get_sorted_translations_by_user_id(current_user_id):
+    if not translations and after_id is None:
         raise_translation_not_found_exception()
 
-    return translation_crud.get_sorted_translations_by_user_id(current_user_id)
+    if has_more:
+        response.headers["X-Next-Cursor"] = encode_cursor(translations[-1].id)
+
+    return translations
 
 
 @router.get(
@@ -96,20 +132,21 @@ def get_current_user_translations(
         },
     }
 )
-def get_translation_by_id(
+async def get_translation_by_id(
         id: int,
         current_user: Annotated[auth_schemas.UserRead, Depends(get_current_user)],
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    translation_crud = TranslationCRUD(db)
+    translation_crud = AsyncTranslationCRUD(db)
+    translation = await translation_crud.get_by_id(id)
 
-    if not translation_crud.get_by_id(id):
+    if not translation:
         raise_translation_not_found_exception()
 
-    if translation_crud.get_by_id(id).user_id != current_user.id:
+    if translation.user_id != current_user.id:
         raise_forbidden_exception()
 
-    return translation_crud.get_by_id(id)
+    return translation
 
 
 @router.post(
@@ -158,12 +195,109 @@ def get_translation_by_id(
 def create_translation(
         file: UploadFile,
         current_user: Annotated[auth_schemas.UserRead, Depends(get_current_user)],
+        services: Annotated[ServiceContainer, Depends(get_services)],
         db: Session = Depends(get_db)
 ):
-    service = TranslationServices(db)
+    service = TranslationServices(db, services)
     return service.create_translation(file, current_user)
 
 
+@router.post(
+    "/jobs",
+    status_code=202,
+    response_model=TranslationJobRead,
+    responses={
+        202: {
+            "description": "Translation job accepted",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "id": "6f1c0a2a9d0b4e5f8a7c3b2d1e0f9a8b",
+                        "status": "queued",
+                        "date_time_created": "2024-06-19T06:37:58.752Z",
+                        "translation": None,
+                        "detail": None
+                    }
+                }
+            }
+        },
+        401: not_authenticated_doc,
+    }
+)
+def create_translation_job(
+        file: UploadFile,
+        current_user: Annotated[auth_schemas.UserRead, Depends(get_current_user)],
+        services: Annotated[ServiceContainer, Depends(get_services)]
+):
+    """
+    Accepts a video and translates it in the background. Poll the returned job until its status is
+    "succeeded" (the translation is then included) or "failed".
+    """
+    return translation_jobs.submit(file, current_user, services)
+
+
+@router.get(
+    "/jobs/{id}",
+    response_model=TranslationJobRead,
+    responses={
+        200: {
+            "description": "Succesfully retrieved translation job",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "id": "6f1c0a2a9d0b4e5f8a7c3b2d1e0f9a8b",
+                        "status": "succeeded",
+                        "date_time_created": "2024-06-19T06:37:58.752Z",
+                        "translation": {
+                            "id": 1,
+                            "video_url": "https://storage.googleapis.com/translation_url_example",
+                            "translation_text": "Saya",
+                            "date_time_created": "2024-06-19T06:38:04.131Z",
+                            "feedback": None,
+                            "user_id": 1
+                        },
+                        "detail": None
+                    }
+                }
+            }
+        },
+        401: not_authenticated_doc,
+        403: {
+            "description": "Access to this resource is not allowed.",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Access to this resource is not allowed."}
+                }
+            }
+        },
+        404: {
+            "description": "Translation job not found",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": "Translation job not found."
+                    }
+                }
+            }
+        },
+    }
+)
+def get_translation_job_by_id(
+        id: str,
+        current_user: Annotated[auth_schemas.UserRead, Depends(get_current_user)]
+):
+    job = translation_jobs.get(id)
+
+    if not job:
+        raise_translation_job_not_found_exception()
+
+    if job.user_id != current_user.id:
+        raise_forbidden_exception()
+
+    return job
+
+
 @router.put(
     "/{id}/feedbacks",
     response_model=TranslationRead,
@@ -196,11 +330,20 @@ def create_translation(
         }
     }
 )
-def update_feedback_by_id(
+async def update_feedback_by_id(
         id: int,
         feedback: FeedbackUpdate,
         current_user: Annotated[auth_schemas.UserRead, Depends(get_current_user)],
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ):
-    service = TranslationServices(db)
-    return service.update_feedback_by_id(id, feedback, current_user)
\ No newline at end of file
+    translation_crud = AsyncTranslationCRUD(db)
+    translation = await translation_crud.get_by_id(id)
+
+    if not translation:
+        raise_translation_not_found_exception()
+
+    if translation.user_id != current_user.id:
+        raise_forbidden_exception()
+
+    translation.feedback = feedback.feedback
+    return await translation_crud.update_translation(translation)
\ No newline at end of file
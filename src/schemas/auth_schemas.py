@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -26,3 +28,4 @@ class Token(BaseModel):
 class TokenCreate(BaseModel):
     user_id: int
     access_token: str
+    expires_at: datetime
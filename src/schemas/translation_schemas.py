@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -29,3 +31,14 @@ class TranslationCreate(BaseModel):
 
 class FeedbackUpdate(BaseModel):
     feedback: str
+
+
+class TranslationJobRead(BaseModel):
+    id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    date_time_created: datetime
+    translation: TranslationRead | None = None
+    detail: str | None = None
+
+    class Config:
+        from_attributes = True
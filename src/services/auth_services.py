@@ -1,14 +1,25 @@
+import asyncio
+import logging
+import uuid
 from datetime import datetime, timedelta
 from typing import Annotated, Union
 
 import jwt, os
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..crud.auth_crud import get_user_by_username, get_token_by_access_token
-from ..utils import get_db, pwd_context
+from ..crud.auth_crud import get_user_by_username, update_user_password, delete_expired_tokens, \
+    get_user_by_username_async, get_token_by_access_token_async
+from ..database import SessionLocal
+from ..exceptions.auth_exceptions import raise_password_service_busy_exception
+from ..schemas import auth_schemas
+from .cache_services import principal_cache
+from ..utils import get_async_db
+from .password_services import password_hasher, PasswordServiceBusy
 
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY")
 if not SECRET_KEY:
@@ -16,18 +27,50 @@ if not SECRET_KEY:
 
 ALGORITHM = "HS256"
 
+TOKEN_PURGE_INTERVAL = float(os.environ.get("TOKEN_PURGE_INTERVAL", "3600"))
+TOKEN_PURGE_BATCH_SIZE = int(os.environ.get("TOKEN_PURGE_BATCH_SIZE", "1000"))
+
+logger = logging.getLogger(__name__)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except PasswordServiceBusy:
+        raise_password_service_busy_exception()
+
 
+async def verify_password(plain_password, hashed_password) -> tuple[bool, str | None]:
+    try:
+        return await password_hasher.verify_and_update(plain_password, hashed_password)
+    except PasswordServiceBusy:
+        raise_password_service_busy_exception()
+
+
+def get_user_credentials(db: Session, username: str):
+    """
+    Returns the user and their password hash, then gives the session's connection back to the pool: the
+    caller goes on to bcrypt, and a burst of logins holding connections through it would exhaust the pool.
+    """
+    try:
+        user = get_user_by_username(db, username)
+        if not user:
+            return None, None
+        return auth_schemas.UserRead.model_validate(user), user.password
+    finally:
+        db.close()
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user_by_username(db, username)
+
+async def authenticate_user(db: Session, username: str, password: str):
+    user, hashed_password = await run_in_threadpool(get_user_credentials, db, username)
     if not user:
         return False
-    if not verify_password(password, user.password):
+    verified, new_hash = await verify_password(password, hashed_password)
+    if not verified:
         return False
+    if new_hash:
+        await run_in_threadpool(update_user_password, db, user.id, new_hash)
     return user
 
 
@@ -37,25 +80,52 @@ def create_access_token(data: dict, expires_delta: Union[timedelta | None] = Non
         expire = datetime.now() + expires_delta
     else:
         expire = datetime.now() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    # A unique id keeps tokens issued within the same second apart, tokens are stored by their digest.
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)):
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials.",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    generation = principal_cache.generation()
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if (not username) or not (get_token_by_access_token(db, access_token=token)):
+        if (not username) or not (await get_token_by_access_token_async(db, access_token=token)):
             raise credentials_exception
     except InvalidTokenError:
         raise credentials_exception
-    user = get_user_by_username(db, username=username)
+    user = await get_user_by_username_async(db, username=username)
     if not user:
         raise credentials_exception
+    user = auth_schemas.UserRead.model_validate(user)
+    principal_cache.put(token, user, user.id, payload.get("exp", 0), generation)
     return user
+
+
+def purge_expired_tokens(batch_size: int = TOKEN_PURGE_BATCH_SIZE) -> int:
+    db = SessionLocal()
+    try:
+        return delete_expired_tokens(db, datetime.now(), batch_size)
+    finally:
+        db.close()
+
+
+async def purge_expired_tokens_periodically(interval: float = TOKEN_PURGE_INTERVAL):
+    """Deletes expired tokens every `interval` seconds until cancelled."""
+    while True:
+        try:
+            deleted = await run_in_threadpool(purge_expired_tokens)
+            logger.info("Purged %d expired tokens", deleted)
+        except Exception:
+            logger.exception("Could not purge expired tokens")
+        await asyncio.sleep(interval)
@@ -0,0 +1,119 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+
+MICROBATCH_ENABLED = os.environ.get("ML_MICROBATCH_ENABLED", "true").lower() == "true"
+MICROBATCH_MAX_SIZE = int(os.environ.get("ML_MICROBATCH_MAX_SIZE", "64"))
+MICROBATCH_MAX_DELAY_MS = float(os.environ.get("ML_MICROBATCH_MAX_DELAY_MS", "5"))
+
+
+@dataclass
+class _Request:
+    model: object
+    batch: np.ndarray
+    future: Future
+
+
+class InferenceScheduler:
+    """
+    Runs the windows of concurrent translations through the classifier together. Each caller submits its
+    batch and waits; a scheduler thread collects submissions until `max_size` windows are pending or
+    `max_delay_ms` has passed since the first one, runs them as one batch and hands every caller its rows.
+
+    The scheduler only waits while other translations are producing windows (see `producer`), so a lone
+    request is never delayed. Submissions are only combined when they are for the same model.
+    """
+
+    def __init__(self, max_size: int, max_delay_ms: float):
+        self.max_size = max_size
+        self.max_delay = max_delay_ms / 1000
+        self.batches = 0
+        self.windows = 0
+        self.submissions = 0
+        self._requests = queue.Queue()
+        self._producers = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @contextmanager
+    def producer(self):
+        """Marks the caller as a translation that will submit windows until the block exits."""
+        with self._lock:
+            self._producers += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._producers -= 1
+
+    def predict(self, model, batch: np.ndarray) -> np.ndarray:
+        """Returns `model.predict_on_batch(batch)`, computed together with other pending submissions."""
+        request = _Request(model, batch, Future())
+        self._start()
+        self._requests.put(request)
+        return request.future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"batches": self.batches, "windows": self.windows, "submissions": self.submissions}
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            for model in {id(request.model): request.model for request in pending}.values():
+                self._predict(model, [request for request in pending if request.model is model])
+
+    def _collect(self) -> list[_Request]:
+        pending = [self._requests.get()]
+        size = len(pending[0].batch)
+        deadline = time.monotonic() + self.max_delay
+        while size < self.max_size:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    others_producing = self._producers > len(pending)
+                timeout = deadline - time.monotonic()
+                if not others_producing or timeout <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            pending.append(request)
+            size += len(request.batch)
+        return pending
+
+    def _predict(self, model, requests: list[_Request]):
+        try:
+            results = model.predict_on_batch(np.concatenate([request.batch for request in requests]))
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        with self._lock:
+            self.batches += 1
+            self.windows += len(results)
+            self.submissions += len(requests)
+
+        start = 0
+        for request in requests:
+            end = start + len(request.batch)
+            request.future.set_result(results[start:end])
+            start = end
+
+
+inference_scheduler = InferenceScheduler(MICROBATCH_MAX_SIZE, MICROBATCH_MAX_DELAY_MS)
@@ -0,0 +1,273 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import BinaryIO, Callable, TypeVar
+
+import numpy as np
+
+from .upload_services import atomic_write
+
+FEATURE_CACHE_MAX_BYTES = int(os.environ.get("FEATURE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+FEATURE_CACHE_DIR = os.environ.get("FEATURE_CACHE_DIR")
+TRANSLATION_CACHE_SIZE = int(os.environ.get("TRANSLATION_CACHE_SIZE", "4096"))
+PRINCIPAL_CACHE_SIZE = int(os.environ.get("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.environ.get("PRINCIPAL_CACHE_TTL", "60"))
+
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+T = TypeVar("T")
+
+
+def file_digest(file: BinaryIO) -> str:
+    """Returns the SHA-256 hex digest of a file's content and rewinds it."""
+    file.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(DIGEST_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """
+    Cache of the landmark feature matrices of uploaded videos, keyed by content hash and landmark profile,
+    so a repeated upload skips decoding and landmarking.
+
+    Entries are kept in memory up to `max_bytes` with least-recently-used eviction. With `directory` set,
+    entries are also written there compressed and read back on a memory miss; the directory is not pruned.
+    """
+
+    def __init__(self, max_bytes: int, directory: str | None = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            features = self._entries.get(key)
+            if features is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return features
+
+        features = self._read(key)
+        with self._lock:
+            if features is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, features)
+            return features
+
+    def put(self, key: str, features: np.ndarray):
+        features.setflags(write=False)
+        with self._lock:
+            self._remember(key, features)
+        self._write(key, features)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _remember(self, key: str, features: np.ndarray):
+        if features.nbytes > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= previous.nbytes
+
+        self._entries[key] = features
+        self._size += features.nbytes
+
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.nbytes
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _read(self, key: str) -> np.ndarray | None:
+        if not self.directory:
+            return None
+        try:
+            with np.load(self._path(key)) as data:
+                features = data["features"]
+        except (OSError, KeyError, ValueError):
+            return None
+        features.setflags(write=False)
+        return features
+
+    def _write(self, key: str, features: np.ndarray):
+        if not self.directory:
+            return
+        with atomic_write(self._path(key), suffix=".npz.tmp") as f:
+            np.savez_compressed(f, features=features)
+
+
+class TranslationCache:
+    """Least-recently-used cache of translation texts, keyed by upload content hash and model version."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            translation_text = self._entries.get(key)
+            if translation_text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return translation_text
+
+    def put(self, key: str, translation_text: str):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = translation_text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries)}
+
+
+class PrincipalCache:
+    """
+    Least-recently-used cache of the users authenticated by access tokens, so a request with a recently seen
+    token skips the token and user queries. An entry lives for `ttl` seconds, never past the token's expiry.
+
+    `invalidate_user` drops a user's entries on logout. Entries are cached per process, so a logout served
+    by another worker only takes effect here once the entry's TTL has passed.
+    """
+
+    # get_current_user runs two queries on a miss: the token lookup and the user lookup.
+    QUERIES_PER_LOOKUP = 2
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def generation(self) -> int:
+        """Pass to `put` for a user looked up after this call, so a logout in between is not undone."""
+        with self._lock:
+            return self._generation
+
+    def get(self, token: str):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, user, user_id: int, expires_at: float, generation: int):
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        expires_at = min(expires_at, time.time() + self.ttl)
+        with self._lock:
+            if generation != self._generation:
+                return
+            key = self._key(token)
+            self._entries[key] = (user_id, user, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            self._generation += 1
+            for key in [key for key, entry in self._entries.items() if entry[0] == user_id]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "queries_saved": self.hits * self.QUERIES_PER_LOOKUP}
+
+    @staticmethod
+    def _key(token: str) -> str:
+        # Keyed by a digest so the cache holds no usable tokens.
+        return hashlib.sha256(token.encode()).hexdigest()
+
+
+class InflightRequests:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the function, the others wait for
+    its result (or its exception) instead of running it again.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[key]
+
+
+feature_cache = FeatureCache(FEATURE_CACHE_MAX_BYTES, FEATURE_CACHE_DIR)
+translation_cache = TranslationCache(TRANSLATION_CACHE_SIZE)
+inflight_translations = InflightRequests()
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
@@ -0,0 +1,47 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import Request
+
+from .ml_services import MLServices
+from .storage_services import StorageServices, get_storage_service
+
+STORAGE_UPLOAD_WORKERS = int(os.environ.get("STORAGE_UPLOAD_WORKERS", "8"))
+
+services_lock = threading.Lock()
+
+
+class ServiceContainer:
+    """
+    The clients shared by all requests: the ML service, the storage client with its HTTP connection pool,
+    and the executor running storage uploads. Created once per application and closed on shutdown.
+    """
+
+    def __init__(self, ml_service: MLServices, storage_service: StorageServices,
+                 upload_workers: int = STORAGE_UPLOAD_WORKERS):
+        self.ml_service = ml_service
+        self.storage_service = storage_service
+        self.upload_executor = ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix="storage-upload")
+
+    @classmethod
+    def create(cls) -> "ServiceContainer":
+        return cls(MLServices(), get_storage_service())
+
+    def close(self):
+        self.upload_executor.shutdown(wait=True)
+        self.storage_service.close()
+
+
+def get_services(request: Request) -> ServiceContainer:
+    """
+    Returns the application's service container. The lifespan creates it at startup; it is created on first
+    use when the application runs without its lifespan, e.g. under a TestClient not used as a context manager.
+    """
+    services = getattr(request.app.state, "services", None)
+    if services is None:
+        with services_lock:
+            services = getattr(request.app.state, "services", None)
+            if services is None:
+                services = request.app.state.services = ServiceContainer.create()
+    return services
@@ -1,25 +1,39 @@
 import os
-import uuid
 
 from fastapi import UploadFile
 from google.cloud import storage
 
-BUCKET_NAME = os.environ["BUCKET_NAME"]
+from .storage_services import StorageServices
 
+BUCKET_NAME = os.environ.get("BUCKET_NAME")
+# Uploads are sent in resumable chunks of this size, which must be a multiple of 256 KiB.
+GCS_CHUNK_SIZE = int(os.environ.get("GCS_CHUNK_SIZE", 8 * 1024 * 1024))
 
-class GCPStorageServices:
-    def __init__(self):
+
+class GCPStorageServices(StorageServices):
+    def __init__(self, chunk_size: int = GCS_CHUNK_SIZE):
+        if not BUCKET_NAME:
+            raise RuntimeError("BUCKET_NAME env variable is not set.")
         self.storage_client = storage.Client()
         self.bucket_name = BUCKET_NAME
-
-    def __call__(self):
-        return self
+        self.base_url = f"https://storage.googleapis.com/{self.bucket_name}"
+        self.chunk_size = chunk_size
 
     def upload_file(self, file: UploadFile) -> str:
         bucket = self.storage_client.bucket(self.bucket_name)
-        randomize_file_name = uuid.uuid4().hex
-        file_path = f"videos/{randomize_file_name}"
-        blob = bucket.blob(file_path)
+        file_path = self._new_file_path()
+        blob = bucket.blob(file_path, chunk_size=self.chunk_size)
+        # Files of up to 8 MiB are sent in a single request, larger ones (or of unknown size) in a resumable
+        # upload session. The object must not exist yet, which makes retrying safe: a resumable upload then
+        # continues from the last chunk the server received.
         blob.upload_from_file(file.file,
-                              content_type=file.content_type)
-        return f"https://storage.googleapis.com/{self.bucket_name}/{file_path}"
+                              size=file.size,
+                              content_type=file.content_type,
+                              if_generation_match=0)
+        return f"{self.base_url}/{file_path}"
+
+    def delete_file(self, video_url: str):
+        self.storage_client.bucket(self.bucket_name).blob(self._file_path(video_url)).delete()
+
+    def close(self):
+        self.storage_client.close()
@@ -0,0 +1,107 @@
+import contextlib
+import io
+import os
+import tempfile
+import threading
+from os.path import join
+
+import numpy as np
+
+from .upload_services import atomic_write
+
+INFERENCE_BACKEND = os.environ.get("ML_INFERENCE_BACKEND", "keras")
+TFLITE_QUANTIZATION = os.environ.get("ML_TFLITE_QUANTIZATION", "none")
+TFLITE_CACHE_DIR = os.environ.get("ML_TFLITE_CACHE_DIR", join(tempfile.gettempdir(), "silang-tflite"))
+TFLITE_NUM_THREADS = int(os.environ.get("ML_TFLITE_NUM_THREADS", "1"))
+
+TFLITE_QUANTIZATIONS = ("none", "float16", "dynamic")
+
+
+class KerasBackend:
+    def __init__(self, model_path: str):
+        import tensorflow as tf
+
+        self.model = tf.keras.models.load_model(model_path, )
+
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        return self.model.predict_on_batch(batch)
+
+
+class TFLiteBackend:
+    """
+    Runs the classifier through a TensorFlow Lite interpreter, which has far less per-call overhead than
+    Keras. The interpreter is built for one window at a time, so a batch is run window by window.
+    """
+
+    def __init__(self, tflite_path: str, num_threads: int = TFLITE_NUM_THREADS):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+
+        self.interpreter = Interpreter(model_path=tflite_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input_index = self.interpreter.get_input_details()[0]["index"]
+        self._output_index = self.interpreter.get_output_details()[0]["index"]
+        # An interpreter must not be invoked from several threads at once.
+        self._lock = threading.Lock()
+
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        results = []
+        with self._lock:
+            for window in batch:
+                self.interpreter.set_tensor(self._input_index, window[np.newaxis])
+                self.interpreter.invoke()
+                results.append(self.interpreter.get_tensor(self._output_index)[0].copy())
+        return np.stack(results)
+
+
+def convert_to_tflite(model_path: str, tflite_path: str, quantization: str = "none"):
+    """Converts the Keras .h5 model into a TFLite model for single windows, optionally quantized."""
+    if quantization not in TFLITE_QUANTIZATIONS:
+        raise ValueError(f"Unknown TFLite quantization {quantization!r}, expected one of {TFLITE_QUANTIZATIONS}.")
+
+    import keras
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(model_path, )
+    window_shape = model.input_shape[1:]
+
+    with tempfile.TemporaryDirectory() as saved_model_dir:
+        # A fixed batch dimension lets the converter lower the LSTM layers to builtin TFLite ops.
+        archive = keras.export.ExportArchive()
+        archive.track(model)
+        archive.add_endpoint("serve", model.call, input_signature=[tf.TensorSpec((1, *window_shape), tf.float32)])
+        with contextlib.redirect_stdout(io.StringIO()):
+            archive.write_out(saved_model_dir)
+
+        converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+        if quantization != "none":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        tflite_model = converter.convert()
+
+    os.makedirs(os.path.dirname(tflite_path) or ".", exist_ok=True)
+    with atomic_write(tflite_path) as f:
+        f.write(tflite_model)
+
+
+def load_backend(model_path: str, model_version: str, backend: str = INFERENCE_BACKEND,
+                 quantization: str = TFLITE_QUANTIZATION, cache_dir: str = TFLITE_CACHE_DIR):
+    """
+    Returns the classifier for the configured backend, "keras" or "tflite". The TFLite model is converted
+    from the .h5 model once per model version and quantization and reused from `cache_dir` afterwards.
+    """
+    if backend == "keras":
+        return KerasBackend(model_path)
+
+    if backend == "tflite":
+        tflite_path = join(cache_dir, f"ml_model-{model_version}-{quantization}.tflite")
+        if not os.path.exists(tflite_path):
+            convert_to_tflite(model_path, tflite_path, quantization)
+        return TFLiteBackend(tflite_path)
+
+    raise ValueError(f"Unknown inference backend {backend!r}, expected 'keras' or 'tflite'.")
@@ -0,0 +1,132 @@
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Callable
+
+from fastapi import HTTPException, UploadFile
+
+from ..database import SessionLocal
+from ..schemas.auth_schemas import UserRead
+from ..schemas.translation_schemas import TranslationRead
+from .container_services import ServiceContainer
+from .translation_services import TranslationServices
+from .upload_services import copy_stream
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_JOB_WORKERS = int(os.environ.get("TRANSLATION_JOB_WORKERS", "2"))
+TRANSLATION_JOB_HISTORY = int(os.environ.get("TRANSLATION_JOB_HISTORY", "10000"))
+TRANSLATION_JOB_DIR = os.environ.get("TRANSLATION_JOB_DIR") or None
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+@dataclass
+class TranslationJob:
+    id: str
+    user_id: int
+    status: str = QUEUED
+    translation: TranslationRead | None = None
+    detail: str | None = None
+    date_time_created: datetime = field(default_factory=datetime.now)
+
+
+class LocalJobQueue:
+    """
+    Runs translation jobs on an in-process thread pool and keeps their status in memory, so the asynchronous
+    API works without a broker. Job status is lost on restart and is only visible to the process that
+    accepted the job; the most recent `history` jobs are kept.
+
+    Every job gets its own database session from `session_factory`, since the request's session is closed
+    once the 202 response is sent.
+    """
+
+    def __init__(self, max_workers: int, history: int, directory: str | None = None,
+                 session_factory: Callable = SessionLocal):
+        self.history = history
+        self.directory = directory
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self._executor = None
+        self._jobs: OrderedDict[str, TranslationJob] = OrderedDict()
+        self._lock = threading.Lock()
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def submit(self, file: UploadFile, user: UserRead, services: ServiceContainer) -> TranslationJob:
+        """Stores the upload and queues its translation. The upload is read before returning."""
+        video_path = self._store_upload(file.file)
+        job = TranslationJob(id=uuid.uuid4().hex, user_id=user.id)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="translation-job")
+            executor = self._executor
+
+        try:
+            executor.submit(self._run, job, video_path, file.filename, file.headers, user, services)
+        except RuntimeError:
+            os.remove(video_path)
+            with self._lock:
+                del self._jobs[job.id]
+            raise
+        return job
+
+    def get(self, job_id: str) -> TranslationJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait: bool = True):
+        """Stops the workers. Jobs submitted afterwards start new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _store_upload(self, source: BinaryIO) -> str:
+        source.seek(0)
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".mp4", delete=False) as video_file:
+            copy_stream(source, video_file)
+        return video_file.name
+
+    def _run(self, job: TranslationJob, video_path: str, filename: str | None, headers, user: UserRead,
+             services: ServiceContainer):
+        job.status = RUNNING
+        db = self.session_factory()
+        try:
+            with open(video_path, "rb") as video_file:
+                upload = UploadFile(file=video_file, size=os.path.getsize(video_path), filename=filename,
+                                    headers=headers)
+                job.translation = TranslationServices(db, services).create_translation(upload, user)
+            job.status = SUCCEEDED
+        except HTTPException as e:
+            job.detail = e.detail
+            job.status = FAILED
+        except Exception:
+            logger.exception("Translation job %s failed", job.id)
+            job.detail = "Translation failed."
+            job.status = FAILED
+        finally:
+            db.close()
+            os.remove(video_path)
+
+    def _forget_old_jobs(self):
+        while len(self._jobs) > self.history:
+            oldest_id = next(iter(self._jobs))
+            if self._jobs[oldest_id].status in (QUEUED, RUNNING):
+                break
+            del self._jobs[oldest_id]
+
+
+translation_jobs = LocalJobQueue(TRANSLATION_JOB_WORKERS, TRANSLATION_JOB_HISTORY, TRANSLATION_JOB_DIR)
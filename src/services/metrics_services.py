@@ -0,0 +1,49 @@
+from typing import Callable
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+TRANSLATION_STAGE_SECONDS = Histogram(
+    "silang_translation_stage_seconds",
+    "Time spent in each stage of a translation request.",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+FRAMES_PROCESSED = Counter("silang_frames_processed", "Video frames decoded and landmarked.")
+WINDOWS_PREDICTED = Counter("silang_windows_predicted", "Feature windows classified into words.")
+VIDEO_BYTES = Counter("silang_video_bytes", "Bytes of the videos uploaded for translation.")
+
+# Keys of the services' stats() that only ever grow; everything else is exposed as a gauge.
+COUNTER_STATS = {
+    "hits", "misses", "evictions", "queries_saved", "direct", "copied", "bytes_copied", "batches", "windows",
+    "submissions", "rejected", "checkouts", "timeouts", "checkout_seconds", "requests", "queries", "seconds",
+}
+
+
+class StatsCollector:
+    """
+    Exposes the stats() dicts the services keep as Prometheus metrics, read at scrape time. Every key
+    becomes a metric named silang_<prefix>_<key>. With `label` set, `stats` returns one dict per value of
+    that label instead.
+    """
+
+    def __init__(self):
+        self._sources = []
+
+    def add(self, prefix: str, stats: Callable[[], dict], label: str | None = None):
+        self._sources.append((prefix, stats, label))
+
+    def collect(self):
+        families = {}
+        for prefix, stats, label in self._sources:
+            labelled_stats = stats().items() if label else [(None, stats())]
+            for label_value, values in labelled_stats:
+                for key, value in values.items():
+                    name = f"silang_{prefix}_{key}"
+                    family = families.get(name)
+                    if family is None:
+                        family_class = CounterMetricFamily if key in COUNTER_STATS else GaugeMetricFamily
+                        family = families[name] = family_class(name, f"{key} of {prefix}",
+                                                               labels=[label] if label else [])
+                    family.add_metric([label_value] if label else [], value)
+        yield from families.values()
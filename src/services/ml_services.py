@@ -1,140 +1,441 @@
-import math
+import logging
+import queue
 import tempfile
+import threading
+import time
 import os
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, replace
+from itertools import chain
+from operator import attrgetter
 from os.path import dirname, abspath, join
 
 from fastapi import UploadFile
-import mediapipe as mp
 import cv2
-import tensorflow as tf
-from sklearn.preprocessing import LabelEncoder
 import numpy as np
 
+from .batching_services import MICROBATCH_ENABLED, inference_scheduler
+from .cache_services import feature_cache, file_digest
+from .inference_services import load_backend
+from .metrics_services import TRANSLATION_STAGE_SECONDS, FRAMES_PROCESSED, WINDOWS_PREDICTED
+from .pipeline_services import StagedPipeline, Stage, StageTiming, TimedIterator
+from .upload_services import copy_stream, upload_fd_path
+
+logger = logging.getLogger(__name__)
+
 model_path = join(dirname(dirname(abspath(__file__))), 'resource', 'ml_model.h5')
-model = tf.keras.models.load_model(model_path, )
+model = None
+model_lock = threading.Lock()
+
+with open(model_path, 'rb') as model_file:
+    MODEL_VERSION = os.environ.get("MODEL_VERSION") or file_digest(model_file)[:12]
 
 dirs_path = join(dirname(dirname(abspath(__file__))), 'resource', 'words.txt')
 file = open(dirs_path, 'r')
 dirs = file.read().split('\n')
-print(dirs)
 file.close()
 
-holistic = mp.solutions.holistic.Holistic(model_complexity=2,
-                                          min_detection_confidence=0.5,
-                                          min_tracking_confidence=0.5)
 
+def get_model():
+    """
+    Returns the classifier of the configured inference backend, loading it on first use. TensorFlow is
+    imported only then, so processes that never translate (auth-only workers, most tests) do not pay for it
+    at import time.
+    """
+    global model
+    if model is None:
+        with model_lock:
+            if model is None:
+                model = load_backend(model_path, MODEL_VERSION)
+    return model
+
+HOLISTIC_POOL_SIZE = int(os.environ.get("HOLISTIC_POOL_SIZE", os.cpu_count() or 1))
+
+
+class HolisticPool:
+    """
+    Hands out MediaPipe Holistic graphs to one translation at a time. A graph tracks landmarks across
+    consecutive frames, so it must not be shared by concurrent requests. Up to `size` graphs are created
+    on demand; further checkouts wait until one is returned.
+    """
+
+    def __init__(self, size: int, **holistic_options):
+        self.size = size
+        self.holistic_options = holistic_options
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self):
+        holistic = self._acquire()
+        try:
+            yield holistic
+        finally:
+            # Drop the tracking state of this video before the graph is handed to the next one.
+            holistic.reset()
+            self._idle.put(holistic)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+
+        if create:
+            try:
+                import mediapipe as mp
+
+                return mp.solutions.holistic.Holistic(**self.holistic_options)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        return self._idle.get()
+
+
+@dataclass(frozen=True)
+class LandmarkProfile:
+    """
+    Quality/speed trade-off of the landmark pass: the Holistic model complexity (0, 1 or 2), the longest
+    frame side in pixels before frames are downscaled for detection (None keeps the full resolution) and
+    the stride between landmarked frames. A stride above 1 makes each 30-frame window span more of the
+    video than the classifier was trained on, so it trades accuracy for speed.
+    """
+    name: str
+    model_complexity: int
+    max_resolution: int | None = None
+    frame_stride: int = 1
+
+
+LANDMARK_PROFILES = {
+    "accurate": LandmarkProfile("accurate", model_complexity=2),
+    "fast": LandmarkProfile("fast", model_complexity=1, max_resolution=640),
+}
+
+
+def _landmark_profile_from_env() -> LandmarkProfile:
+    profile = LANDMARK_PROFILES[os.environ.get("ML_PROFILE", "accurate")]
+    if os.environ.get("HOLISTIC_MODEL_COMPLEXITY"):
+        profile = replace(profile, model_complexity=int(os.environ["HOLISTIC_MODEL_COMPLEXITY"]))
+    if os.environ.get("ML_MAX_RESOLUTION"):
+        profile = replace(profile, max_resolution=int(os.environ["ML_MAX_RESOLUTION"]))
+    if os.environ.get("ML_FRAME_STRIDE"):
+        profile = replace(profile, frame_stride=int(os.environ["ML_FRAME_STRIDE"]))
+    return profile
+
+
+LANDMARK_PROFILE = _landmark_profile_from_env()
+
+holistic_pools = {}
+holistic_pools_lock = threading.Lock()
+
+
+def get_holistic_pool(model_complexity: int) -> HolisticPool:
+    with holistic_pools_lock:
+        if model_complexity not in holistic_pools:
+            holistic_pools[model_complexity] = HolisticPool(HOLISTIC_POOL_SIZE,
+                                                            model_complexity=model_complexity,
+                                                            min_detection_confidence=0.5,
+                                                            min_tracking_confidence=0.5)
+        return holistic_pools[model_complexity]
+
+WINDOW_SIZE = 30
+PREDICT_BATCH_SIZE = int(os.environ.get("PREDICT_BATCH_SIZE", "32"))
+PIPELINE_ENABLED = os.environ.get("ML_PIPELINE_ENABLED", "true").lower() == "true"
+PIPELINE_QUEUE_SIZE = int(os.environ.get("ML_PIPELINE_QUEUE_SIZE", "8"))
+
+POSE_LANDMARKS = 33
+HAND_LANDMARKS = 21
+POSE_END = POSE_LANDMARKS * 4
+LEFT_HAND_END = POSE_END + HAND_LANDMARKS * 3
+FEATURES_PER_FRAME = LEFT_HAND_END + HAND_LANDMARKS * 3
+
+# Per feature, the feature it is made relative to: the same coordinate of the first landmark of its part.
+# Visibility stays absolute, its RELATIVE_FEATURE is 0.
+ROOT_FEATURE = np.concatenate([np.tile(np.arange(4), POSE_LANDMARKS),
+                               POSE_END + np.tile(np.arange(3), HAND_LANDMARKS),
+                               LEFT_HAND_END + np.tile(np.arange(3), HAND_LANDMARKS)])
+RELATIVE_FEATURE = np.concatenate([np.tile([1.0, 1.0, 1.0, 0.0], POSE_LANDMARKS),
+                                   np.ones(FEATURES_PER_FRAME - POSE_END)])
+
+_pose_values = attrgetter("x", "y", "z", "visibility")
+_hand_values = attrgetter("x", "y", "z")
+_NO_POSE = (0.0,) * POSE_END
+_NO_HAND = (0.0,) * (HAND_LANDMARKS * 3)
+
+
+class VideoSourceStats:
+    """Counts how uploads reached the decoder: opened in place, or copied to a temporary file first."""
 
-class MLServices:
     def __init__(self):
-        self.model = model
-        self.dirs = dirs
-        self.holistic = holistic
-        self.temp_file_path = ""
+        self.direct = 0
+        self.copied = 0
+        self.bytes_copied = 0
+        self._lock = threading.Lock()
+
+    def record(self, bytes_copied: int | None = None):
+        with self._lock:
+            if bytes_copied is not None:
+                self.copied += 1
+                self.bytes_copied += bytes_copied
+            else:
+                self.direct += 1
 
-    def do_translation(self, file: UploadFile) -> str:
-        self._save_file_tmp(file)
+    def stats(self) -> dict:
+        with self._lock:
+            return {"direct": self.direct, "copied": self.copied, "bytes_copied": self.bytes_copied}
 
-        cap = cv2.VideoCapture(self.temp_file_path)
 
-        if not cap.isOpened():
-            raise ValueError("Error opening video file.")
+video_source_stats = VideoSourceStats()
 
-        frames = self._get_frames(cap)
 
-        cap.release()
+def _landmark_values(results):
+    """Iterates over the x, y, z (and for the pose visibility) of every landmark of a frame, zeros for missing parts."""
+    pose, left_hand, right_hand = results.pose_landmarks, results.left_hand_landmarks, results.right_hand_landmarks
+    return chain(chain.from_iterable(map(_pose_values, pose.landmark)) if pose else _NO_POSE,
+                 chain.from_iterable(map(_hand_values, left_hand.landmark)) if left_hand else _NO_HAND,
+                 chain.from_iterable(map(_hand_values, right_hand.landmark)) if right_hand else _NO_HAND)
 
-        translation_text = self._predict(frames)
 
-        os.remove(self.temp_file_path)
+class MLServices:
+    def __init__(self, profile: LandmarkProfile = LANDMARK_PROFILE):
+        self._model = None
+        self.dirs = dirs
+        self.profile = profile
+        self.holistic_pool = get_holistic_pool(profile.model_complexity)
+        self.feature_cache = feature_cache
+        self.batch_size = PREDICT_BATCH_SIZE
+        self.inference_scheduler = inference_scheduler if MICROBATCH_ENABLED else None
+        self.pipelined = PIPELINE_ENABLED
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = get_model()
+        return self._model
+
+    @model.setter
+    def model(self, value):
+        self._model = value
+
+    def warm_up(self):
+        """Loads the classifier and builds a Holistic graph, then runs both on dummy input."""
+        # Keras traces the model again for a second batch size, after which it accepts any batch size.
+        for batch_size in (1, 2):
+            self.model.predict_on_batch(np.zeros((batch_size, WINDOW_SIZE, FEATURES_PER_FRAME), dtype=np.float32))
+        with self.holistic_pool.checkout() as holistic:
+            self._mediapipe_detection(np.zeros((480, 640, 3), dtype=np.uint8), holistic)
+
+    def do_translation(self, file: UploadFile, digest: str | None = None) -> str:
+        """`digest` is the SHA-256 of the upload if the caller already computed it."""
+        cache_key = self._feature_cache_key(digest or file_digest(file.file))
+        features = self.feature_cache.get(cache_key)
+        if features is not None:
+            windows = features.reshape(-1, WINDOW_SIZE, FEATURES_PER_FRAME)
+            labels = TimedIterator(self._labels(self._batches(windows)))
+            translation_text = " ".join(labels)
+            self._observe_timings({"predict": labels.timing})
+            return translation_text
+
+        windows = []
+        timings = {}
+        with self._video_path(file) as video_path:
+            cap = cv2.VideoCapture(video_path)
+
+            if not cap.isOpened():
+                raise ValueError("Error opening video file.")
+
+            try:
+                with self.holistic_pool.checkout() as holistic:
+                    if self.pipelined:
+                        translation_text = self._predict_pipelined(cap, holistic, windows, timings)
+                    else:
+                        translation_text = self._predict(self._get_frames(cap), holistic, windows, timings)
+            finally:
+                cap.release()
+
+        self._observe_timings(timings)
+        self.feature_cache.put(cache_key, np.concatenate(windows) if windows
+                               else np.zeros((0, FEATURES_PER_FRAME), dtype=np.float32))
 
         return translation_text
 
-    def _save_file_tmp(self, file: UploadFile):
+    @staticmethod
+    def _observe_timings(timings: dict[str, StageTiming]):
+        for stage, timing in timings.items():
+            TRANSLATION_STAGE_SECONDS.labels(stage).observe(timing.busy_seconds)
+        if "decode" in timings:
+            FRAMES_PROCESSED.inc(timings["decode"].items)
+        WINDOWS_PREDICTED.inc(timings["predict"].items)
+
+    @contextmanager
+    def _video_path(self, file: UploadFile):
+        """
+        Yields a path the decoder can open for the upload. Starlette spools uploads into a temporary file,
+        which is opened in place through /proc/self/fd once it is on disk; only when that is not possible (an
+        in-memory file or spool, no procfs) is the upload copied to a temporary file in chunks, and counted
+        as such. The copy is removed on exit.
+        """
+        start = time.perf_counter()
+        file.file.seek(0)
+        fd_path = upload_fd_path(file.file)
+        if fd_path:
+            video_source_stats.record()
+            TRANSLATION_STAGE_SECONDS.labels("video_source").observe(time.perf_counter() - start)
+            yield fd_path
+            return
+
         with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp_file:
-            temp_file.write(file.file.read())
-            self.temp_file_path = temp_file.name
-            file.file.seek(0)
+            copied = copy_stream(file.file, temp_file)
+        file.file.seek(0)
+        video_source_stats.record(copied)
+        TRANSLATION_STAGE_SECONDS.labels("video_source").observe(time.perf_counter() - start)
+        try:
+            yield temp_file.name
+        finally:
+            os.remove(temp_file.name)
 
     def _get_frames(self, cap):
-        frames = []
         while True:
             ret, frame = cap.read()
 
             if not ret:
                 break
 
-            frames.append(frame)
-
-        return frames
-
-    def _predict(self, frames):
-        results = []
-        i = 30
-        j = 0
-        while i <= len(frames):
-            res = frames[j:i]
-            res = self._preprocessing(res)
-            res = np.array(res, dtype='float32')
-            res = np.expand_dims(res, axis=0)
-            result = self.model.predict(res, verbose=0)[0]
-            index = np.argmax(result)
-            print(index)
-            print(result[index])
-
-            j = i
-            i += 30
-            results.append(self.dirs[index])
-
-        return " ".join(results)
-
-    def _preprocessing(self, frames):
-        frames = np.array(frames)
-        mediapipe_processed_data = []
-        for frame in frames:
-            image, results = self._mediapipe_detection(frame, self.holistic)
-            landmark_data = []
-
-            pose_landmarks = results.pose_landmarks
-            left_hand_landmarks = results.left_hand_landmarks
-            right_hand_landmarks = results.right_hand_landmarks
-
-            if pose_landmarks:
-                base_x = pose_landmarks.landmark[0].x
-                base_y = pose_landmarks.landmark[0].y
-                base_z = pose_landmarks.landmark[0].z
+            yield frame
+
+            # Skipped frames are only grabbed, which avoids converting them into images.
+            for _ in range(self.profile.frame_stride - 1):
+                if not cap.grab():
+                    return
+
+    def translation_cache_key(self, digest: str) -> str:
+        """Key of the translation of the upload with this content hash under the current model and profile."""
+        return f"{MODEL_VERSION}-{self._feature_cache_key(digest)}"
+
+    def _feature_cache_key(self, digest: str) -> str:
+        # Features depend on the landmark settings as well as on the video.
+        profile = self.profile
+        return f"{digest}-c{profile.model_complexity}-r{profile.max_resolution or 0}-s{profile.frame_stride}"
+
+    def _predict(self, frames, holistic, collected=None, timings=None):
+        """Decodes, landmarks and predicts one item after the other. Fills `timings` when given."""
+        frames = TimedIterator(frames)
+        windows = TimedIterator(self._windows(frames, holistic, collected))
+        labels = TimedIterator(self._labels(self._batches(windows)))
+        translation_text = " ".join(labels)
+
+        if timings is not None:
+            # Each iterator's time includes the ones it reads from.
+            timings["decode"] = frames.timing
+            timings["landmark"] = replace(windows.timing,
+                                          busy_seconds=windows.timing.busy_seconds - frames.timing.busy_seconds)
+            timings["predict"] = replace(labels.timing,
+                                         busy_seconds=labels.timing.busy_seconds - windows.timing.busy_seconds)
 
-                for landmark in pose_landmarks.landmark:
-                    landmark_data.extend(
-                        [landmark.x - base_x, landmark.y - base_y, landmark.z - base_z, landmark.visibility])
-            else:
-                landmark_data.extend([0] * (33 * 4))
-
-            if left_hand_landmarks:
-                base_x = left_hand_landmarks.landmark[0].x
-                base_y = left_hand_landmarks.landmark[0].y
-                base_z = left_hand_landmarks.landmark[0].z
-
-                for landmark in left_hand_landmarks.landmark:
-                    landmark_data.extend([landmark.x - base_x, landmark.y - base_y, landmark.z - base_z])
-            else:
-                landmark_data.extend([0] * (21 * 3))
-
-            if right_hand_landmarks:
-                base_x = right_hand_landmarks.landmark[0].x
-                base_y = right_hand_landmarks.landmark[0].y
-                base_z = right_hand_landmarks.landmark[0].z
-
-                for landmark in right_hand_landmarks.landmark:
-                    landmark_data.extend([landmark.x - base_x, landmark.y - base_y, landmark.z - base_z])
-            else:
-                landmark_data.extend([0] * (21 * 3))
-
-            mediapipe_processed_data.append(landmark_data)
+        return translation_text
 
-        return mediapipe_processed_data
+    def _predict_pipelined(self, cap, holistic, collected=None, timings=None):
+        """Like `_predict`, but decodes, landmarks and predicts concurrently. Fills `timings` when given."""
+        pipeline = StagedPipeline(queue_size=PIPELINE_QUEUE_SIZE)
+        labels = list(pipeline.run(
+            Stage("decode", lambda _: self._get_frames(cap)),
+            Stage("landmark", lambda frames: self._windows(frames, holistic, collected)),
+            Stage("predict", self._labels, batch_size=self.batch_size),
+        ))
+
+        if timings is not None:
+            timings.update(pipeline.timings)
+        logger.debug("Translation stage timings: %s", ", ".join(
+            f"{name} {timing.busy_seconds:.3f}s busy/{timing.wait_seconds:.3f}s waiting ({timing.items} items)"
+            for name, timing in pipeline.timings.items()))
+
+        return " ".join(labels)
+
+    def _labels(self, batches):
+        with self.inference_scheduler.producer() if self.inference_scheduler else nullcontext():
+            for batch in batches:
+                for result in self._predict_batch(np.stack(batch)):
+                    index = np.argmax(result)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Predicted %s (%d) with confidence %.4f", self.dirs[index], index, result[index],
+                                     extra={"label": self.dirs[index], "label_index": int(index),
+                                            "confidence": float(result[index])})
+
+                    yield self.dirs[index]
+
+    def _predict_batch(self, batch):
+        if self.inference_scheduler:
+            return self.inference_scheduler.predict(self.model, batch)
+        return self.model.predict_on_batch(batch)
+
+    def _batches(self, windows):
+        batch = []
+        for window in windows:
+            batch.append(window)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def _windows(self, frames, holistic, collected=None):
+        """
+        Yields the (30, 258) feature window of every complete run of 30 frames while the frames are read,
+        so the decoded frames of the whole video are never held at once. Trailing frames that do not fill
+        a window produce no prediction. Windows are also appended to `collected` when given.
+        """
+        window = np.zeros((WINDOW_SIZE, FEATURES_PER_FRAME), dtype=np.float32)
+        filled = 0
+        for frame in frames:
+            self._landmark_frame(frame, window[filled], holistic)
+            filled += 1
+
+            if filled == WINDOW_SIZE:
+                if collected is not None:
+                    collected.append(window)
+                yield window
+                window = np.zeros((WINDOW_SIZE, FEATURES_PER_FRAME), dtype=np.float32)
+                filled = 0
+
+    def _preprocessing(self, frames, holistic):
+        features = np.zeros((len(frames), FEATURES_PER_FRAME), dtype=np.float32)
+        for row, frame in zip(features, frames):
+            self._landmark_frame(frame, row, holistic)
+
+        return features
+
+    def _landmark_frame(self, frame, row, holistic):
+        image, results = self._mediapipe_detection(frame, holistic)
+        self._extract_landmarks(results, row)
+
+    def _extract_landmarks(self, results, row):
+        # Fills a feature row in place from one read of all landmarks. Coordinates are made relative to the
+        # first landmark of each part in float64 and only then narrowed to float32, exactly like the former
+        # list-based rows.
+        values = np.fromiter(_landmark_values(results), dtype=np.float64, count=FEATURES_PER_FRAME)
+        np.subtract(values, values[ROOT_FEATURE] * RELATIVE_FEATURE, out=row, casting="same_kind")
 
     def _mediapipe_detection(self, image, holistic_model):
+        image = self._downscale(image)
         image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)  # COLOR CONVERSION BGR 2 RGB
         results = holistic_model.process(image)  # Make prediction
         image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)  # COLOR CONVERSION RGB 2 BGR
         return image, results
+
+    def _downscale(self, image):
+        max_resolution = self.profile.max_resolution
+        height, width = image.shape[:2]
+        if not max_resolution or max(height, width) <= max_resolution:
+            return image
+
+        scale = max_resolution / max(height, width)
+        return cv2.resize(image, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
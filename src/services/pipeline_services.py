@@ -0,0 +1,192 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+
+_DONE = object()
+_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class StageTiming:
+    busy_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    items: int = 0
+
+
+class TimedIterator:
+    """
+    Wraps an iterator and adds up the time spent producing its items in `timing.busy_seconds`. For
+    iterators chained in one thread this includes the time spent in the ones they read from.
+    """
+
+    def __init__(self, iterable: Iterable):
+        self.timing = StageTiming()
+        self._iterator = iter(iterable)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            item = next(self._iterator)
+        finally:
+            self.timing.busy_seconds += time.perf_counter() - start
+        self.timing.items += 1
+        return item
+
+
+@dataclass
+class Stage:
+    """
+    A pipeline step. `transform` receives an iterator over the items of the previous stage and returns an
+    iterator over its own items. With `batch_size` set, it receives lists of up to that many items instead,
+    made of whatever the previous stage has already produced.
+    """
+    name: str
+    transform: Callable[[Iterator], Iterable]
+    batch_size: int | None = None
+
+
+class _StageFailed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _UpstreamFailed(Exception):
+    def __init__(self, failure: _StageFailed):
+        self.failure = failure
+
+
+class _Stopped(Exception):
+    pass
+
+
+class StagedPipeline:
+    """
+    Runs every stage on its own thread, connected by bounded queues, so that e.g. decoding frame N+1
+    overlaps landmarking frame N and predicting the previous window.
+
+    After a run, `timings` holds per stage the time spent working (`busy_seconds`), the time spent waiting
+    for the previous stage (`wait_seconds`) and the number of items produced. The stage with the most busy
+    time limits the throughput.
+    """
+
+    def __init__(self, queue_size: int = 8):
+        self.queue_size = queue_size
+        self.timings: dict[str, StageTiming] = {}
+        self._stop = threading.Event()
+
+    def run(self, *stages: Stage):
+        """Yields the items of the last stage. Errors raised by any stage are re-raised here."""
+        self.timings = {stage.name: StageTiming() for stage in stages}
+        self._stop.clear()
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        threads = [
+            threading.Thread(target=self._run_stage,
+                             args=(stage, queues[i - 1] if i else None, queues[i]),
+                             name=f"pipeline-{stage.name}",
+                             daemon=True)
+            for i, stage in enumerate(stages)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _StageFailed):
+                    raise item.error
+                yield item
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+    def _run_stage(self, stage: Stage, input_queue, output_queue):
+        timing = self.timings[stage.name]
+        inputs = self._read(input_queue, timing, stage.batch_size) if input_queue else iter(())
+        outputs = iter(stage.transform(inputs))
+        try:
+            while True:
+                start = time.perf_counter()
+                waited = timing.wait_seconds
+                try:
+                    item = next(outputs)
+                except StopIteration:
+                    break
+                timing.busy_seconds += time.perf_counter() - start - (timing.wait_seconds - waited)
+                timing.items += 1
+                self._put(output_queue, item)
+            self._put(output_queue, _DONE)
+        except _Stopped:
+            pass
+        except _UpstreamFailed as e:
+            self._forward_failure(output_queue, e.failure)
+        except Exception as e:
+            self._forward_failure(output_queue, _StageFailed(e))
+        finally:
+            close = getattr(outputs, "close", None)
+            if close:
+                close()
+
+    def _read(self, input_queue, timing: StageTiming, batch_size: int | None):
+        while True:
+            start = time.perf_counter()
+            item = self._get(input_queue)
+            timing.wait_seconds += time.perf_counter() - start
+            if item is _DONE:
+                return
+            if isinstance(item, _StageFailed):
+                raise _UpstreamFailed(item)
+
+            if not batch_size:
+                yield item
+                continue
+
+            batch = [item]
+            finished = None
+            while len(batch) < batch_size:
+                try:
+                    item = input_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _DONE or isinstance(item, _StageFailed):
+                    finished = item
+                    break
+                batch.append(item)
+
+            yield batch
+
+            if finished is _DONE:
+                return
+            if finished is not None:
+                raise _UpstreamFailed(finished)
+
+    def _get(self, input_queue):
+        while True:
+            try:
+                return input_queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise _Stopped()
+
+    def _put(self, output_queue, item):
+        while True:
+            try:
+                output_queue.put(item, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    raise _Stopped()
+
+    def _forward_failure(self, output_queue, failure: _StageFailed):
+        try:
+            self._put(output_queue, failure)
+        except _Stopped:
+            pass
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Checkouts of a connection pool, how long they took and how many timed out."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"checkouts": self.checkouts, "timeouts": self.timeouts,
+                    "checkout_seconds": self.checkout_seconds, "max_checkout_seconds": self.max_checkout_seconds}
+
+
+class InstrumentedPoolMixin:
+    """
+    Times every checkout of a QueuePool, from asking for a connection until getting one: waiting for a
+    connection to be returned, opening a new one and the pre-ping all count. The stats survive the
+    pool being recreated by engine.dispose().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.checkout_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.checkout_stats.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.checkout_stats = self.checkout_stats
+        return pool
+
+    def pool_stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            # QueuePool counts overflow from -size, it is negative while the pool is not full yet
+            "overflow": max(self.overflow(), 0),
+            "timeout": self.timeout(),
+            **self.checkout_stats.stats(),
+        }
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
@@ -0,0 +1,121 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_WARN_THRESHOLD = int(os.environ.get("QUERY_WARN_THRESHOLD", "20"))
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Number of SQL statements run and the time spent in them, for one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+
+
+class QueryMetrics:
+    """Totals of QueryStats per endpoint, across requests."""
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, query_stats: QueryStats):
+        with self._lock:
+            totals = self._endpoints.setdefault(endpoint, {"requests": 0, "queries": 0, "seconds": 0.0})
+            totals["requests"] += 1
+            totals["queries"] += query_stats.count
+            totals["seconds"] += query_stats.seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {endpoint: dict(totals) for endpoint, totals in self._endpoints.items()}
+
+
+_current_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Counts the statements run in this context, including threadpool calls made from it. Threads started
+    or executors submitted to from it do not carry the context and are not counted.
+    """
+    query_stats = QueryStats()
+    token = _current_query_stats.set(query_stats)
+    try:
+        yield query_stats
+    finally:
+        _current_query_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_query_stats.get() is not None:
+        context.query_start_time = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    query_stats = _current_query_stats.get()
+    start = getattr(context, "query_start_time", None)
+    if query_stats is not None and start is not None:
+        query_stats.record(time.perf_counter() - start)
+
+
+class QueryCountMiddleware:
+    """
+    Tracks the statements each request runs until its response starts, reports them in the X-DB-Query-Count
+    and X-DB-Time-Ms response headers and adds them to `metrics` under the matched route. Requests running
+    more than `warn_threshold` statements are logged.
+    """
+
+    def __init__(self, app, metrics: QueryMetrics, warn_threshold: int = QUERY_WARN_THRESHOLD):
+        self.app = app
+        self.metrics = metrics
+        self.warn_threshold = warn_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as query_stats:
+            async def send_with_query_stats(message):
+                if message["type"] == "http.response.start":
+                    self._report(scope, query_stats)
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-query-count", str(query_stats.count).encode()),
+                        (b"x-db-time-ms", f"{query_stats.seconds * 1e3:.1f}".encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_query_stats)
+
+    def _report(self, scope, query_stats: QueryStats):
+        route = scope.get("route")
+        endpoint = f"{scope['method']} {route.path if route is not None else 'unmatched'}"
+        self.metrics.observe(endpoint, query_stats)
+        if query_stats.count > self.warn_threshold:
+            logger.warning("%s ran %d queries in %.1f ms", endpoint, query_stats.count, query_stats.seconds * 1e3)
+        else:
+            logger.debug("%s ran %d queries in %.1f ms", endpoint, query_stats.count, query_stats.seconds * 1e3)
+
+
+query_metrics = QueryMetrics()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from os.path import join
+
+from fastapi import UploadFile
+
+from .upload_services import atomic_write, copy_stream
+
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "gcs")
+LOCAL_STORAGE_DIR = os.environ.get("LOCAL_STORAGE_DIR", join(tempfile.gettempdir(), "silang-storage"))
+LOCAL_STORAGE_BASE_URL = os.environ.get("LOCAL_STORAGE_BASE_URL", f"file://{LOCAL_STORAGE_DIR}")
+
+
+class StorageServices(ABC):
+    """
+    Stores uploaded videos. `upload_file` stores the file under `videos/<random name>` and returns its URL,
+    `base_url/videos/<random name>`; `delete_file` takes such a URL.
+    """
+
+    base_url: str
+
+    def __call__(self):
+        return self
+
+    @abstractmethod
+    def upload_file(self, file: UploadFile) -> str:
+        pass
+
+    @abstractmethod
+    def delete_file(self, video_url: str):
+        pass
+
+    def close(self):
+        """Releases the backend's connections."""
+
+    @staticmethod
+    def _new_file_path() -> str:
+        return f"videos/{uuid.uuid4().hex}"
+
+    def _file_path(self, video_url: str) -> str:
+        return video_url.removeprefix(f"{self.base_url}/")
+
+
+class LocalStorageServices(StorageServices):
+    """Stores videos in a local directory, for development and offline benchmarks."""
+
+    def __init__(self, directory: str = LOCAL_STORAGE_DIR, base_url: str = LOCAL_STORAGE_BASE_URL):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(join(directory, "videos"), exist_ok=True)
+
+    def upload_file(self, file: UploadFile) -> str:
+        file_path = self._new_file_path()
+        with atomic_write(join(self.directory, file_path)) as f:
+            copy_stream(file.file, f)
+        return f"{self.base_url}/{file_path}"
+
+    def delete_file(self, video_url: str):
+        os.remove(join(self.directory, self._file_path(video_url)))
+
+
+def get_storage_service() -> StorageServices:
+    """Returns the storage backend selected by STORAGE_BACKEND, "gcs" or "local"."""
+    if STORAGE_BACKEND == "gcs":
+        from .gcp_storage_services import GCPStorageServices
+
+        return GCPStorageServices()
+
+    if STORAGE_BACKEND == "local":
+        return LocalStorageServices()
+
+    raise ValueError(f"Unknown storage backend {STORAGE_BACKEND!r}, expected 'gcs' or 'local'.")
@@ -1,32 +1,43 @@
-import os
+import io
+import logging
 from datetime import datetime
 
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
 
-from .gcp_storage_services import GCPStorageServices
+from .cache_services import file_digest, translation_cache, inflight_translations
+from .container_services import ServiceContainer
+from .metrics_services import TRANSLATION_STAGE_SECONDS, VIDEO_BYTES
+from .upload_services import upload_fd_path
 from ..crud.translation_crud import TranslationCRUD
-from ..exceptions.translation_exceptions import raise_translation_not_found_exception, raise_forbidden_exception
-from ..schemas.translation_schemas import FeedbackUpdate
-from .ml_services import MLServices
 from ..schemas.auth_schemas import UserRead
 from ..schemas.translation_schemas import TranslationCreate, TranslationRead
 
+logger = logging.getLogger(__name__)
+
 
 class TranslationServices:
-    def __init__(self, db: Session):
-        self.ml_service = MLServices()
-        self.storage_service = GCPStorageServices()
+    def __init__(self, db: Session, services: ServiceContainer):
+        self.ml_service = services.ml_service
+        self.storage_service = services.storage_service
+        self.upload_executor = services.upload_executor
         self.crud = TranslationCRUD(db)
 
     def create_translation(self, file: UploadFile, user: UserRead) -> TranslationRead:
         self._check_file_is_valid()
 
-        # do translation
-        translation_text = self.ml_service.do_translation(file)
-
-        # store video to google cloud storage
-        video_url = self.storage_service.upload_file(file)
+        # store video to cloud storage, and do translation while it uploads unless this video was
+        # already translated
+        if file.size is not None:
+            VIDEO_BYTES.inc(file.size)
+        with TRANSLATION_STAGE_SECONDS.labels("digest").time():
+            digest = file_digest(file.file)
+        cache_key = self.ml_service.translation_cache_key(digest)
+        translation_text = translation_cache.get(cache_key)
+        if translation_text is not None:
+            video_url = self._upload(file)
+        else:
+            video_url, translation_text = self._upload_while_translating(file, digest, cache_key)
 
         # store translation result to database
         new_translation = TranslationCreate(
@@ -35,20 +46,72 @@ class TranslationServices:
             translation_text=translation_text,
             date_time_created=datetime.now()
         )
-        return self.crud.store_translation(new_translation)
+        with TRANSLATION_STAGE_SECONDS.labels("store").time():
+            return self.crud.store_translation(new_translation)
+
+    def _upload_while_translating(self, file: UploadFile, digest: str, cache_key: str) -> tuple[str, str]:
+        """
+        Stores the video to cloud storage while it is being translated and returns both results. If the
+        translation fails, the uploaded video is deleted again.
+        """
+        upload_source = self._reopen(file)
+        if upload_source is None:
+            # the upload would move the file position under the decoder, so run one after the other
+            translation_text = inflight_translations.run(cache_key, lambda: self._translate(file, digest, cache_key))
+            return self._upload(file), translation_text
+
+        try:
+            upload = self.upload_executor.submit(self._upload_and_close, upload_source)
+        except BaseException:
+            upload_source.file.close()
+            raise
+        try:
+            translation_text = inflight_translations.run(cache_key, lambda: self._translate(file, digest, cache_key))
+        except BaseException:
+            upload.add_done_callback(self._delete_orphaned_upload)
+            raise
+        return upload.result(), translation_text
+
+    def _upload(self, file: UploadFile) -> str:
+        with TRANSLATION_STAGE_SECONDS.labels("upload").time():
+            return self.storage_service.upload_file(file)
 
-    def update_feedback_by_id(self, id: int, feedback: FeedbackUpdate, user: UserRead) -> TranslationRead:
-        translation = self.crud.get_by_id(id)
+    def _upload_and_close(self, file: UploadFile) -> str:
+        try:
+            return self._upload(file)
+        finally:
+            file.file.close()
 
-        if not translation:
-            raise_translation_not_found_exception()
+    def _delete_orphaned_upload(self, upload):
+        if upload.exception() is not None:
+            return
+        try:
+            self.storage_service.delete_file(upload.result())
+        except Exception:
+            logger.exception("Could not delete the upload of a failed translation %s", upload.result())
 
-        if translation.user_id != user.id:
-            raise_forbidden_exception()
+    @staticmethod
+    def _reopen(file: UploadFile) -> UploadFile | None:
+        """
+        Opens the upload a second time with its own file position: in place if it is on disk, else from a copy
+        of a spool still held in memory, which is at most the spool size.
+        """
+        fd_path = upload_fd_path(file.file)
+        if fd_path is not None:
+            source = open(fd_path, "rb")
+        elif not getattr(file.file, "_rolled", True):
+            file.file.seek(0)
+            source = io.BytesIO(file.file.read())
+            file.file.seek(0)
+        else:
+            return None
+        return UploadFile(file=source, size=file.size, filename=file.filename, headers=file.headers)
 
-        translation.feedback = feedback.feedback
-        self.crud.update_translation(translation)
-        return translation
+    def _translate(self, file: UploadFile, digest: str, cache_key: str) -> str:
+        with TRANSLATION_STAGE_SECONDS.labels("translate").time():
+            translation_text = self.ml_service.do_translation(file, digest)
+        translation_cache.put(cache_key, translation_text)
+        return translation_text
 
     def _check_file_is_valid(self):
         # TODO
@@ -0,0 +1,46 @@
+import io
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def upload_fd_path(file: BinaryIO) -> str | None:
+    """
+    Returns a /proc/self/fd path at which the content of an upload can be opened again, or None when it
+    has none. A SpooledTemporaryFile still held in memory has none: asking for its file descriptor would
+    silently copy it to disk.
+    """
+    if not getattr(file, "_rolled", True):
+        return None
+    try:
+        fd_path = f"/proc/self/fd/{file.fileno()}"
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    return fd_path if os.path.exists(fd_path) else None
+
+
+def copy_stream(source: BinaryIO, target: BinaryIO) -> int:
+    """Copies the rest of `source` to `target` in chunks of COPY_CHUNK_SIZE and returns the bytes copied."""
+    start = target.tell()
+    shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+    return target.tell() - start
+
+
+@contextmanager
+def atomic_write(path: str, suffix: str = ".tmp"):
+    """
+    Yields a temporary file next to `path` that replaces `path` once the block completes, so readers never
+    see a partial file. The temporary file is removed if the block raises.
+    """
+    temp_file = tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or ".", suffix=suffix, delete=False)
+    try:
+        with temp_file:
+            yield temp_file
+        os.replace(temp_file.name, path)
+    except BaseException:
+        os.remove(temp_file.name)
+        raise
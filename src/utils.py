@@ -1,5 +1,7 @@
-from .database import SessionLocal
-from passlib.context import CryptContext
+import base64
+import binascii
+
+from .database import SessionLocal, AsyncSessionLocal
 
 def get_db():
     db = SessionLocal()
@@ -8,4 +10,27 @@ def get_db():
     finally:
         db.close()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Ids are 32-bit integer columns, larger values would overflow the bound parameter on Postgres.
+MAX_CURSOR_ID = 2 ** 31 - 1
+
+
+def encode_cursor(id: int) -> str:
+    """Returns an opaque pagination cursor pointing after the row with this id."""
+    return base64.urlsafe_b64encode(str(id).encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Returns the id an `encode_cursor` cursor points after. Raises ValueError for anything else."""
+    try:
+        value = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor {cursor!r}.")
+    if not (value.isascii() and value.isdigit()) or not 1 <= int(value) <= MAX_CURSOR_ID:
+        raise ValueError(f"Invalid cursor {cursor!r}.")
+    return int(value)
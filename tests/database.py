@@ -1,8 +1,11 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import pytest
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///tests/test.db"
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///tests/test.db"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
@@ -10,6 +13,11 @@ engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool, aiosqlite connections belong to an event loop and the TestClient runs requests on new ones.
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def override_get_db():
     try:
@@ -19,6 +27,11 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture()
 def test_db():
     try:
@@ -26,3 +39,10 @@ def test_db():
         yield db
     finally:
         db.close()
+
+
+def assert_query_budget(response, max_queries: int):
+    """Fails when the request behind `response` ran more SQL statements than `max_queries`."""
+    query_count = int(response.headers["X-DB-Query-Count"])
+    assert query_count <= max_queries, \
+        f"{response.request.method} {response.request.url.path} ran {query_count} queries, budget is {max_queries}"
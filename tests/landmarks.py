@@ -0,0 +1,39 @@
+"""Synthetic Holistic results and the former list-based feature rows, for the tests and benchmarks."""
+from collections import namedtuple
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+HolisticResults = namedtuple("HolisticResults", ["pose_landmarks", "left_hand_landmarks", "right_hand_landmarks"])
+
+
+def make_landmarks(rng, count, with_visibility=False):
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibility in rng.random((count, 4)):
+        landmark = landmark_list.landmark.add(x=x, y=y, z=z)
+        if with_visibility:
+            landmark.visibility = visibility
+    return landmark_list
+
+
+def legacy_rows(all_results):
+    """The feature rows as MLServices._preprocessing built them from lists before it used NumPy."""
+    mediapipe_processed_data = []
+    for results in all_results:
+        landmark_data = []
+        if results.pose_landmarks:
+            base = results.pose_landmarks.landmark[0]
+            for landmark in results.pose_landmarks.landmark:
+                landmark_data.extend(
+                    [landmark.x - base.x, landmark.y - base.y, landmark.z - base.z, landmark.visibility])
+        else:
+            landmark_data.extend([0] * (33 * 4))
+        for hand_landmarks in (results.left_hand_landmarks, results.right_hand_landmarks):
+            if hand_landmarks:
+                base = hand_landmarks.landmark[0]
+                for landmark in hand_landmarks.landmark:
+                    landmark_data.extend([landmark.x - base.x, landmark.y - base.y, landmark.z - base.z])
+            else:
+                landmark_data.extend([0] * (21 * 3))
+        mediapipe_processed_data.append(landmark_data)
+    return np.array(mediapipe_processed_data, dtype="float32")
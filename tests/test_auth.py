@@ -1,11 +1,16 @@
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import create_engine, text
 from fastapi.testclient import TestClient
 
 from src.main import app
-from src.database import Base
-from src.utils import get_db
+from src.database import Base, check_schema
+from src.utils import get_db, get_async_db
 from src.crud import auth_crud
-from .database import engine, override_get_db, test_db
+from src.schemas import auth_schemas
+from src.services import auth_services
+from .database import engine, override_get_db, override_get_async_db, test_db, assert_query_budget
 
 @pytest.fixture()
 def refresh_db():
@@ -13,6 +18,7 @@ def refresh_db():
     Base.metadata.create_all(bind=engine)
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 client = TestClient(app)
 client.base_url = str(client.base_url) + "/api/v1/auth"
@@ -36,8 +42,8 @@ login_data = {
 }
 
 
-def get_auth_header(test_db):
-    access_token = auth_crud.get_token_by_user_id(test_db, user_id=1).access_token
+def get_auth_header():
+    access_token = client.post("/login", data=login_data).json()["access_token"]
     return {"Authorization": f"Bearer {access_token}"}
 
 
@@ -119,6 +125,45 @@ def test_token_saved_in_db(test_db):
 
     assert len(token_list) == 1
     assert token_object.user_id == 1
+    assert len(token_object.token_digest) == 64
+    assert token_object.expires_at > datetime.now()
+
+
+def test_expired_tokens_are_purged_in_batches(test_db):
+    now = datetime.now()
+    for i in range(5):
+        auth_crud.save_token(test_db, auth_schemas.TokenCreate(user_id=2, access_token=f"expired{i}",
+                                                               expires_at=now - timedelta(minutes=i + 1)))
+
+    assert auth_crud.delete_expired_tokens(test_db, now, batch_size=2) == 5
+    assert [token.user_id for token in auth_crud.get_all_tokens(test_db)] == [1]
+
+
+def test_current_user_is_cached(test_db, mocker):
+    auth_header = get_auth_header()
+    client.get("/me", headers=auth_header)
+    get_token = mocker.spy(auth_services, "get_token_by_access_token_async")
+    get_user = mocker.spy(auth_services, "get_user_by_username_async")
+
+    response = client.get("/me", headers=auth_header)
+
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "username": "johndoe"}
+    get_token.assert_not_called()
+    get_user.assert_not_called()
+
+
+def test_auth_query_budget():
+    response = client.post("/login", data=login_data)
+    assert_query_budget(response, 2)
+
+    auth_header = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = client.get("/me", headers=auth_header)
+    assert_query_budget(response, 2)
+
+    # the principal is cached from here on
+    response = client.get("/me", headers=auth_header)
+    assert_query_budget(response, 0)
 
 
 def test_logout_with_invalid_token():
@@ -132,9 +177,33 @@ def test_logout_with_invalid_token():
 
 
 def test_logout_succesful(test_db):
+    auth_header = get_auth_header()
     response = client.post(
         "/logout",
-        headers=get_auth_header(test_db)
+        headers=auth_header
     )
     assert response.status_code == 200
     assert response.json()["detail"] == "Logged out successfully."
+
+    response = client.get("/me", headers=auth_header)
+    assert response.status_code == 401
+
+
+def test_outdated_tables_fail_schema_check():
+    outdated_engine = create_engine("sqlite://")
+    with outdated_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE tokens (id INTEGER PRIMARY KEY, user_id INTEGER, access_token VARCHAR)"))
+
+    with pytest.raises(RuntimeError, match="token_digest, expires_at"):
+        check_schema(outdated_engine)
+
+    with outdated_engine.begin() as connection:
+        connection.execute(text("DROP TABLE tokens"))
+        connection.execute(text("CREATE TABLE translation (id INTEGER PRIMARY KEY, user_id INTEGER, video_url VARCHAR, "
+                                "translation_text VARCHAR, date_time_created DATETIME, feedback TEXT)"))
+        connection.execute(text("CREATE INDEX ix_translation_user_id ON translation (user_id)"))
+
+    with pytest.raises(RuntimeError, match="lacks the columns or indexes ix_translation_user_id_id,"):
+        check_schema(outdated_engine)
+
+    check_schema(engine)
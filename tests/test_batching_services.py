@@ -0,0 +1,93 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.services.batching_services import InferenceScheduler
+
+
+class RecordingModel:
+    """Returns each window's first value as its prediction and records the size of every batch."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_on_batch(self, batch):
+        self.batch_sizes.append(len(batch))
+        return batch[:, 0, :1].copy()
+
+
+def windows(*values):
+    return np.stack([np.full((30, 258), value, dtype=np.float32) for value in values])
+
+
+def predict_concurrently(scheduler, models, batches):
+    results = [None] * len(batches)
+    submitted = threading.Barrier(len(batches))
+
+    def predict(i):
+        with scheduler.producer():
+            submitted.wait()
+            results[i] = scheduler.predict(models[i], batches[i])
+
+    threads = [threading.Thread(target=predict, args=(i,)) for i in range(len(batches))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_submissions_run_as_one_batch():
+    model = RecordingModel()
+    scheduler = InferenceScheduler(max_size=64, max_delay_ms=1000)
+
+    results = predict_concurrently(scheduler, [model] * 3, [windows(1, 2), windows(3), windows(4, 5, 6)])
+
+    assert model.batch_sizes == [6]
+    assert [result[:, 0].tolist() for result in results] == [[1, 2], [3], [4, 5, 6]]
+    assert scheduler.stats() == {"batches": 1, "windows": 6, "submissions": 3}
+
+
+def test_batches_are_capped_at_max_size():
+    model = RecordingModel()
+    scheduler = InferenceScheduler(max_size=2, max_delay_ms=1000)
+
+    results = predict_concurrently(scheduler, [model] * 3, [windows(1), windows(2), windows(3)])
+
+    assert sorted(model.batch_sizes) == [1, 2]
+    assert [result[:, 0].tolist() for result in results] == [[1], [2], [3]]
+
+
+def test_lone_producer_is_not_delayed():
+    model = RecordingModel()
+    scheduler = InferenceScheduler(max_size=64, max_delay_ms=10_000)
+
+    start = time.monotonic()
+    with scheduler.producer():
+        scheduler.predict(model, windows(1))
+
+    assert time.monotonic() - start < 1
+
+
+def test_submissions_for_different_models_are_not_mixed():
+    models = [RecordingModel(), RecordingModel()]
+    scheduler = InferenceScheduler(max_size=64, max_delay_ms=1000)
+
+    results = predict_concurrently(scheduler, models, [windows(0), windows(1)])
+
+    assert models[0].batch_sizes == [1] and models[1].batch_sizes == [1]
+    assert [result[0, 0] for result in results] == [0, 1]
+
+
+def test_model_errors_reach_every_caller():
+    class FailingModel:
+        def predict_on_batch(self, batch):
+            raise RuntimeError("inference failed")
+
+    scheduler = InferenceScheduler(max_size=64, max_delay_ms=10)
+
+    with pytest.raises(RuntimeError, match="inference failed"):
+        scheduler.predict(FailingModel(), windows(1))
+    assert scheduler.predict(RecordingModel(), windows(2))[0, 0] == 2
@@ -0,0 +1,129 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from src.services.cache_services import FeatureCache, TranslationCache, InflightRequests, PrincipalCache, file_digest
+
+
+def features(value, n_frames=30):
+    return np.full((n_frames, 258), value, dtype=np.float32)
+
+
+def test_file_digest_rewinds_file():
+    file = BytesIO(b"video_file")
+
+    assert file_digest(file) == hashlib.sha256(b"video_file").hexdigest()
+    assert file.read() == b"video_file"
+
+
+def test_feature_cache_evicts_least_recently_used():
+    cache = FeatureCache(max_bytes=2 * features(0).nbytes)
+    cache.put("a", features(1))
+    cache.put("b", features(2))
+    cache.get("a")
+    cache.put("c", features(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a")[0, 0] == 1
+    assert cache.get("c")[0, 0] == 3
+    assert cache.stats() == {"hits": 3, "misses": 1, "evictions": 1, "entries": 2, "bytes": 2 * features(0).nbytes}
+
+
+def test_feature_cache_reads_back_from_disk(tmp_path):
+    FeatureCache(max_bytes=0, directory=str(tmp_path)).put("a", features(1, n_frames=60))
+
+    cache = FeatureCache(max_bytes=1024 * 1024, directory=str(tmp_path))
+
+    assert np.array_equal(cache.get("a"), features(1, n_frames=60))
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_translation_cache_evicts_least_recently_used():
+    cache = TranslationCache(max_entries=2)
+    cache.put("a", "Saya")
+    cache.put("b", "Kami")
+    cache.get("a")
+    cache.put("c", "Anda")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "Saya"
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 1, "entries": 2}
+
+
+def test_principal_cache_entries_expire_with_ttl_or_token(freezer):
+    cache = PrincipalCache(max_entries=16, ttl=60)
+    cache.put("long_lived", "johndoe", 1, time.time() + 3600, cache.generation())
+    cache.put("short_lived", "janesmith", 2, time.time() + 10, cache.generation())
+
+    assert cache.get("long_lived") == "johndoe"
+    assert cache.get("short_lived") == "janesmith"
+
+    freezer.tick(30)
+    assert cache.get("short_lived") is None
+    assert cache.get("long_lived") == "johndoe"
+
+    freezer.tick(31)
+    assert cache.get("long_lived") is None
+    assert cache.stats() == {"hits": 3, "misses": 2, "evictions": 0, "entries": 0, "queries_saved": 6}
+
+
+def test_principal_cache_invalidates_user():
+    cache = PrincipalCache(max_entries=16, ttl=60)
+    generation = cache.generation()
+    cache.put("first_token", "johndoe", 1, time.time() + 3600, generation)
+    cache.put("second_token", "johndoe", 1, time.time() + 3600, generation)
+    cache.put("other_token", "janesmith", 2, time.time() + 3600, generation)
+
+    cache.invalidate_user(1)
+    # a lookup that started before the logout must not cache the token again
+    cache.put("first_token", "johndoe", 1, time.time() + 3600, generation)
+
+    assert cache.get("first_token") is None
+    assert cache.get("second_token") is None
+    assert cache.get("other_token") == "janesmith"
+
+
+def test_inflight_requests_run_concurrent_calls_once():
+    inflight = InflightRequests()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def translate():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return "Saya"
+
+    with ThreadPoolExecutor(4) as executor:
+        leader = executor.submit(inflight.run, "digest", translate)
+        started.wait(timeout=5)
+        followers = [executor.submit(inflight.run, "digest", translate) for _ in range(3)]
+        while inflight.coalesced < 3:
+            time.sleep(0.01)
+        release.set()
+
+        assert leader.result() == "Saya"
+        assert [follower.result() for follower in followers] == ["Saya"] * 3
+
+    assert len(calls) == 1
+    # Once finished, the next call for the key runs again.
+    assert inflight.run("digest", lambda: "Kami") == "Kami"
+
+
+def test_inflight_requests_do_not_keep_failures():
+    def fail():
+        raise ValueError("Error opening video file.")
+
+    inflight = InflightRequests()
+
+    with pytest.raises(ValueError):
+        inflight.run("digest", fail)
+    assert inflight.run("digest", lambda: "Saya") == "Saya"
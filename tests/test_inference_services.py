@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from src.services.inference_services import KerasBackend, TFLiteBackend, convert_to_tflite, load_backend
+from src.services.ml_services import model_path, WINDOW_SIZE, FEATURES_PER_FRAME
+
+
+@pytest.fixture(scope="module")
+def windows():
+    rng = np.random.default_rng(0)
+    windows = rng.normal(0, 0.2, (64, WINDOW_SIZE, FEATURES_PER_FRAME)).astype(np.float32)
+    windows[::4] = 0
+    return windows
+
+
+@pytest.mark.parametrize("quantization, min_agreement", [("none", 1.0), ("dynamic", 0.95)])
+def test_tflite_backend_agrees_with_keras(tmp_path, windows, quantization, min_agreement):
+    tflite_path = str(tmp_path / f"ml_model-{quantization}.tflite")
+    convert_to_tflite(model_path, tflite_path, quantization)
+
+    keras_results = KerasBackend(model_path).predict_on_batch(windows)
+    tflite_results = TFLiteBackend(tflite_path).predict_on_batch(windows)
+
+    assert tflite_results.shape == keras_results.shape
+    assert np.mean(tflite_results.argmax(axis=1) == keras_results.argmax(axis=1)) >= min_agreement
+
+
+def test_load_backend_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        load_backend(model_path, "version", backend="onnx")
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.routers import internal_routers
+
+client = TestClient(app)
+
+
+@pytest.fixture()
+def internal_token(mocker):
+    mocker.patch.object(internal_routers, "INTERNAL_API_TOKEN", "internal-token")
+    return "internal-token"
+
+
+def test_read_pool_stats(internal_token):
+    response = client.get("/internal/pools", headers={"X-Internal-Token": internal_token})
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"sync", "async"}
+    assert {"size", "checked_out", "overflow", "checkouts", "timeouts",
+            "max_checkout_seconds"} <= set(response.json()["sync"])
+
+
+def test_read_pool_stats_wrong_token(internal_token):
+    response = client.get("/internal/pools", headers={"X-Internal-Token": "wrong"})
+
+    assert response.status_code == 404
+
+
+def test_read_pool_stats_disabled():
+    response = client.get("/internal/pools", headers={"X-Internal-Token": ""})
+
+    assert response.status_code == 404
+
+
+def test_read_metrics(internal_token):
+    response = client.get("/metrics", headers={"X-Internal-Token": internal_token})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "silang_translation_stage_seconds" in response.text
+    assert 'silang_db_pool_checkouts_total{pool="sync"}' in response.text
+
+
+def test_read_metrics_unauthenticated(internal_token):
+    response = client.get("/metrics")
+
+    assert response.status_code == 404
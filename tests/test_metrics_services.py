@@ -0,0 +1,17 @@
+from prometheus_client import CollectorRegistry
+
+from src.services.metrics_services import StatsCollector
+
+
+def test_stats_collector_exposes_stats():
+    collector = StatsCollector()
+    collector.add("cache", lambda: {"feature": {"hits": 3, "entries": 2}, "principal": {"hits": 5, "entries": 1}},
+                  label="cache")
+    collector.add("password_hasher", lambda: {"pending": 4})
+    registry = CollectorRegistry()
+    registry.register(collector)
+
+    assert registry.get_sample_value("silang_cache_hits_total", {"cache": "feature"}) == 3
+    assert registry.get_sample_value("silang_cache_hits_total", {"cache": "principal"}) == 5
+    assert registry.get_sample_value("silang_cache_entries", {"cache": "principal"}) == 1
+    assert registry.get_sample_value("silang_password_hasher_pending") == 4
@@ -0,0 +1,221 @@
+import os
+import tempfile
+import threading
+from io import BytesIO
+
+import numpy as np
+import pytest
+from fastapi import UploadFile
+
+from src.services.cache_services import FeatureCache
+from src.services.ml_services import MLServices, HolisticPool, LandmarkProfile, FEATURES_PER_FRAME, \
+    video_source_stats
+from .landmarks import HolisticResults, legacy_rows, make_landmarks
+
+@pytest.fixture()
+def holistic_results():
+    rng = np.random.default_rng(0)
+    results = [
+        HolisticResults(make_landmarks(rng, 33, True), make_landmarks(rng, 21), make_landmarks(rng, 21)),
+        HolisticResults(None, None, None),
+        HolisticResults(make_landmarks(rng, 33, True), None, make_landmarks(rng, 21)),
+        HolisticResults(make_landmarks(rng, 33, False), make_landmarks(rng, 21, True), None),
+    ]
+    # A landmark without visibility reads as 0.
+    results[2].pose_landmarks.landmark[5].ClearField("visibility")
+    return results
+
+
+def test_preprocessing_matches_legacy_rows(mocker, holistic_results):
+    mocker.patch.object(MLServices, "_mediapipe_detection",
+                        side_effect=[(None, results) for results in holistic_results])
+    frames = [np.zeros((4, 4, 3), dtype=np.uint8)] * len(holistic_results)
+
+    features = MLServices()._preprocessing(frames, holistic=None)
+
+    assert features.shape == (len(holistic_results), FEATURES_PER_FRAME)
+    assert features.dtype == np.float32
+    assert features.tobytes() == legacy_rows(holistic_results).tobytes()
+
+
+class FakeModel:
+    def __init__(self):
+        self.batch_shapes = []
+
+    def predict_on_batch(self, batch):
+        self.batch_shapes.append(batch.shape)
+        # Class index of each window is its first feature value.
+        return np.eye(15, dtype=np.float32)[batch[:, 0, 0].astype(int)]
+
+
+def label_frame(frame, row, holistic):
+    # Frames are plain class indexes here, written where the features would go.
+    row[0] = frame
+
+
+def test_predict_runs_windows_in_batches(mocker):
+    mocker.patch.object(MLServices, "_landmark_frame", side_effect=label_frame)
+
+    service = MLServices()
+    service.model = FakeModel()
+    service.batch_size = 2
+
+    # Trailing frames that do not fill a window are ignored.
+    frames = [3] * 30 + [0] * 30 + [13] * 60 + [14] * 30 + [1] * 29
+    translation = service._predict(frames, holistic=None)
+
+    assert translation == "Kami -Kan Saya Saya Tunjuk"
+    assert service.model.batch_shapes == [(2, 30, FEATURES_PER_FRAME), (2, 30, FEATURES_PER_FRAME),
+                                          (1, 30, FEATURES_PER_FRAME)]
+
+
+def test_predict_streams_frames(mocker):
+    mocker.patch.object(MLServices, "_landmark_frame", side_effect=label_frame)
+
+    service = MLServices()
+    service.model = FakeModel()
+    service.batch_size = 1
+    frames_read = []
+
+    def frames():
+        for frame in [3] * 30 + [14] * 30:
+            frames_read.append(frame)
+            yield frame
+            # The first window is predicted before the rest of the video is read.
+            assert len(frames_read) <= 30 or service.model.batch_shapes
+
+    assert service._predict(frames(), holistic=None) == "Kami Tunjuk"
+
+
+def test_predict_without_full_window():
+    assert MLServices()._predict(iter([]), holistic=None) == ""
+
+
+class FakeCapture:
+    def __init__(self, frames):
+        self.frames = iter(frames)
+
+    def read(self):
+        frame = next(self.frames, None)
+        return frame is not None, frame
+
+    def grab(self):
+        return next(self.frames, None) is not None
+
+
+def test_pipelined_prediction_matches_sequential(mocker):
+    mocker.patch.object(MLServices, "_landmark_frame", side_effect=label_frame)
+    frames = [3] * 30 + [0] * 30 + [13] * 60 + [14] * 30 + [1] * 29
+
+    service = MLServices()
+    service.model = FakeModel()
+    service.batch_size = 2
+
+    timings, sequential_timings = {}, {}
+    pipelined = service._predict_pipelined(FakeCapture(frames), holistic=None, timings=timings)
+
+    assert pipelined == service._predict(iter(frames), holistic=None, timings=sequential_timings)
+    for stage_timings in (timings, sequential_timings):
+        assert stage_timings["decode"].items == len(frames)
+        assert stage_timings["landmark"].items == 5
+        assert stage_timings["predict"].items == 5
+        assert all(timing.busy_seconds >= 0 for timing in stage_timings.values())
+
+
+def test_holistic_pool_hands_out_each_graph_once(mocker):
+    holistic_class = mocker.patch("mediapipe.solutions.holistic.Holistic",
+                                  side_effect=lambda **options: mocker.Mock())
+    pool = HolisticPool(2, model_complexity=2)
+    third_checked_out = threading.Event()
+
+    def third_request():
+        with pool.checkout():
+            third_checked_out.set()
+
+    with pool.checkout() as first, pool.checkout() as second:
+        assert first is not second
+        waiting = threading.Thread(target=third_request)
+        waiting.start()
+        # Both graphs are checked out, so a third request waits instead of creating another one.
+        assert not third_checked_out.wait(timeout=0.2)
+
+    assert third_checked_out.wait(timeout=1)
+    waiting.join()
+    assert holistic_class.call_count == 2
+    holistic_class.assert_called_with(model_complexity=2)
+    # Every graph is reset when it is returned.
+    assert first.reset.call_count + second.reset.call_count == 3
+
+
+def test_frame_stride_skips_frames():
+    service = MLServices(LandmarkProfile("test", model_complexity=1, frame_stride=3))
+
+    assert list(service._get_frames(FakeCapture(range(1, 11)))) == [1, 4, 7, 10]
+
+
+def test_frames_are_downscaled_to_max_resolution():
+    service = MLServices(LandmarkProfile("test", model_complexity=1, max_resolution=640))
+
+    assert service._downscale(np.zeros((1080, 1920, 3), dtype=np.uint8)).shape == (360, 640, 3)
+    assert service._downscale(np.zeros((480, 640, 3), dtype=np.uint8)).shape == (480, 640, 3)
+
+
+def test_cached_features_skip_decoding(mocker):
+    windows = np.zeros((2, 30, FEATURES_PER_FRAME), dtype=np.float32)
+    windows[:, 0, 0] = [13, 14]
+    service = MLServices()
+    service.model = FakeModel()
+    service.feature_cache = FeatureCache(max_bytes=1024 * 1024)
+    service.feature_cache.put(service._feature_cache_key("digest"), windows.reshape(-1, FEATURES_PER_FRAME))
+    video_path = mocker.patch.object(MLServices, "_video_path")
+
+    translation = service.do_translation(UploadFile(file=BytesIO(b"video_file")), digest="digest")
+
+    assert translation == "Saya Tunjuk"
+    video_path.assert_not_called()
+
+
+def test_spooled_upload_is_decoded_in_place():
+    upload = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    upload.write(b"video_file")
+    upload.rollover()
+    service = MLServices()
+    before = video_source_stats.stats()
+
+    with service._video_path(UploadFile(file=upload)) as path:
+        with open(path, "rb") as f:
+            assert f.read() == b"video_file"
+        assert not path.endswith(".mp4")
+
+    after = video_source_stats.stats()
+    assert after["direct"] - before["direct"] == 1
+    assert (after["copied"], after["bytes_copied"]) == (before["copied"], before["bytes_copied"])
+
+
+def test_spool_in_memory_is_counted_as_copy():
+    upload = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    upload.write(b"video_file")
+    service = MLServices()
+    before = video_source_stats.stats()
+
+    with service._video_path(UploadFile(file=upload)) as path:
+        with open(path, "rb") as f:
+            assert f.read() == b"video_file"
+
+    after = video_source_stats.stats()
+    assert not upload._rolled
+    assert after["direct"] == before["direct"]
+    assert after["copied"] - before["copied"] == 1
+    assert after["bytes_copied"] - before["bytes_copied"] == len(b"video_file")
+
+
+def test_in_memory_upload_is_copied_and_removed_on_error():
+    service = MLServices()
+
+    with pytest.raises(ValueError):
+        with service._video_path(UploadFile(file=BytesIO(b"video_file"))) as path:
+            with open(path, "rb") as f:
+                assert f.read() == b"video_file"
+            raise ValueError()
+
+    assert not os.path.exists(path)
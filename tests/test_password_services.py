@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from passlib.context import CryptContext
+
+from src.services.password_services import PasswordHasher, PasswordServiceBusy, BCRYPT_ROUNDS
+
+
+def test_password_is_hashed_and_verified_in_worker_process():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+
+    async def hash_and_verify():
+        hashed_password = await hasher.hash("secretpassword123")
+        return (hashed_password,
+                await hasher.verify_and_update("secretpassword123", hashed_password),
+                await hasher.verify_and_update("wrongpassword", hashed_password))
+
+    try:
+        hashed_password, correct, wrong = asyncio.run(hash_and_verify())
+    finally:
+        hasher.shutdown()
+
+    assert hashed_password.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+    assert correct == (True, None)
+    assert wrong == (False, None)
+
+
+def test_password_with_other_cost_is_rehashed():
+    hashed_password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=BCRYPT_ROUNDS - 1).hash("secretpassword123")
+    hasher = PasswordHasher(workers=0, max_pending=4)
+
+    verified, new_hash = asyncio.run(hasher.verify_and_update("secretpassword123", hashed_password))
+
+    assert verified
+    assert new_hash.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+
+
+def test_password_work_beyond_limit_is_rejected():
+    hasher = PasswordHasher(workers=0, max_pending=0)
+
+    with pytest.raises(PasswordServiceBusy):
+        asyncio.run(hasher.hash("secretpassword123"))
+    assert hasher.stats() == {"pending": 0, "rejected": 1}
@@ -0,0 +1,47 @@
+import pytest
+
+from src.services.pipeline_services import StagedPipeline, Stage
+
+
+def test_pipeline_preserves_order_and_records_timings():
+    pipeline = StagedPipeline(queue_size=2)
+
+    outputs = list(pipeline.run(
+        Stage("source", lambda _: iter(range(10))),
+        Stage("square", lambda items: (item * item for item in items)),
+        Stage("sum", lambda batches: (sum(batch) for batch in batches), batch_size=4),
+    ))
+
+    assert sum(outputs) == sum(item * item for item in range(10))
+    assert list(pipeline.timings) == ["source", "square", "sum"]
+    assert pipeline.timings["square"].items == 10
+    assert pipeline.timings["sum"].items == len(outputs)
+
+
+def test_pipeline_batches_hold_at_most_batch_size_items():
+    pipeline = StagedPipeline(queue_size=8)
+
+    batches = list(pipeline.run(
+        Stage("source", lambda _: iter(range(20))),
+        Stage("batch", lambda batches: batches, batch_size=3),
+    ))
+
+    assert [item for batch in batches for item in batch] == list(range(20))
+    assert all(1 <= len(batch) <= 3 for batch in batches)
+
+
+def test_pipeline_reraises_stage_errors():
+    def fail_on_three(items):
+        for item in items:
+            if item == 3:
+                raise ValueError("Error opening video file.")
+            yield item
+
+    pipeline = StagedPipeline(queue_size=1)
+
+    with pytest.raises(ValueError, match="Error opening video file."):
+        list(pipeline.run(
+            Stage("source", lambda _: iter(range(100))),
+            Stage("fail", fail_on_three),
+            Stage("identity", lambda items: items),
+        ))
@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from src.services.pool_services import InstrumentedQueuePool
+
+
+@pytest.fixture()
+def pool_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    yield engine
+    engine.dispose()
+
+
+def test_pool_stats_count_checkouts_and_timeouts(pool_engine):
+    with pool_engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            pool_engine.connect()
+
+        stats = pool_engine.pool.pool_stats()
+
+    assert (stats["size"], stats["checked_out"], stats["overflow"]) == (1, 1, 0)
+    assert (stats["checkouts"], stats["timeouts"]) == (1, 1)
+    assert stats["max_checkout_seconds"] >= 0.05
+
+
+def test_pool_stats_survive_dispose(pool_engine):
+    with pool_engine.connect():
+        pass
+    pool_engine.dispose()
+    with pool_engine.connect():
+        pass
+
+    assert pool_engine.pool.pool_stats()["checkouts"] == 2
@@ -0,0 +1,43 @@
+import asyncio
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from src.services.query_services import QueryMetrics, track_queries
+from tests.database import engine
+
+
+def run_queries(count):
+    with engine.connect() as connection:
+        for _ in range(count):
+            connection.execute(text("SELECT 1"))
+
+
+def test_track_queries_counts_statements_in_its_context():
+    run_queries(2)
+    with track_queries() as query_stats:
+        run_queries(3)
+    run_queries(2)
+
+    assert query_stats.count == 3
+    assert query_stats.seconds > 0
+
+
+def test_track_queries_counts_threadpool_calls():
+    async def handler():
+        with track_queries() as query_stats:
+            await run_in_threadpool(run_queries, 2)
+        return query_stats
+
+    assert asyncio.run(handler()).count == 2
+
+
+def test_query_metrics_totals_per_endpoint():
+    metrics = QueryMetrics()
+    for count in (1, 3):
+        with track_queries() as query_stats:
+            run_queries(count)
+        metrics.observe("GET /me", query_stats)
+
+    totals = metrics.stats()["GET /me"]
+    assert (totals["requests"], totals["queries"]) == (2, 4)
@@ -0,0 +1,42 @@
+import os
+from io import BytesIO
+
+from fastapi import UploadFile
+
+from src.services.gcp_storage_services import GCPStorageServices
+from src.services.storage_services import LocalStorageServices
+
+
+def test_local_storage_stores_and_deletes_video(tmp_path):
+    storage = LocalStorageServices(str(tmp_path), base_url="http://localhost:8000/static/")
+
+    video_url = storage.upload_file(UploadFile(file=BytesIO(b"video_file"), filename="video.mp4"))
+
+    assert video_url.startswith("http://localhost:8000/static/videos/")
+    file_path = tmp_path / video_url.removeprefix("http://localhost:8000/static/")
+    assert file_path.read_bytes() == b"video_file"
+    assert os.listdir(tmp_path / "videos") == [file_path.name]
+
+    storage.delete_file(video_url)
+
+    assert not file_path.exists()
+
+
+def test_gcs_upload_is_chunked_and_conditional(mocker):
+    client = mocker.patch("google.cloud.storage.Client").return_value
+    blob = client.bucket.return_value.blob.return_value
+    storage = GCPStorageServices(chunk_size=256 * 1024)
+    file = BytesIO(b"video_file")
+
+    video_url = storage.upload_file(UploadFile(file=file, size=10, filename="video.mp4",
+                                               headers={"content-type": "video/mp4"}))
+
+    file_path = client.bucket.return_value.blob.call_args.args[0]
+    assert video_url == f"https://storage.googleapis.com/{storage.bucket_name}/{file_path}"
+    client.bucket.return_value.blob.assert_called_once_with(file_path, chunk_size=256 * 1024)
+    blob.upload_from_file.assert_called_once_with(file, size=10, content_type="video/mp4", if_generation_match=0)
+
+    storage.delete_file(video_url)
+
+    client.bucket.return_value.blob.assert_called_with(file_path)
+    blob.delete.assert_called_once_with()
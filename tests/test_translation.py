@@ -1,4 +1,9 @@
+import threading
+import time
+
 import pytest
+from fastapi import UploadFile
+from prometheus_client import REGISTRY
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from datetime import datetime
@@ -9,10 +14,15 @@ from src.main import app
 from src.models.translation_models import Translation
 from src.schemas.auth_schemas import UserRead
 from src.services.auth_services import get_current_user
-from src.utils import get_db
+from src.utils import get_db, get_async_db, encode_cursor
+from src.services.cache_services import TranslationCache
+from src.services.container_services import ServiceContainer
+from src.services.job_services import translation_jobs
 from src.services.ml_services import MLServices
-from src.services.translation_services import GCPStorageServices
-from tests.database import override_get_db, test_db, engine
+from src.services.translation_services import TranslationServices
+from src.services.gcp_storage_services import GCPStorageServices
+from tests.database import override_get_db, override_get_async_db, test_db, engine, TestingSessionLocal, \
+    assert_query_budget
 
 
 @pytest.fixture(autouse=True)
@@ -29,6 +39,7 @@ def client_authenticated():
 
     app.dependency_overrides[get_current_user] = override_auth
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     return TestClient(app)
 
 
@@ -36,9 +47,24 @@ def client_authenticated():
 def client_not_authenticated():
     app.dependency_overrides[get_current_user] = get_current_user
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     return TestClient(app)
 
 
+@pytest.fixture()
+def translation_jobs_use_test_db(mocker):
+    mocker.patch.object(translation_jobs, "session_factory", TestingSessionLocal)
+
+
+def wait_for_job(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(f"api/v1/translations/jobs/{job_id}")
+        if response.json()["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return response
+        time.sleep(0.01)
+
+
 @pytest.fixture()
 def add_translations_to_db(test_db: Session):
     translations = [
@@ -70,6 +96,116 @@ def test_create_translation_success(client_authenticated, mocker, freezer):  # f
     assert response.json()["feedback"] is None
 
 
+def test_create_translation_is_measured(client_authenticated, mocker):
+    mocker.patch("src.services.translation_services.translation_cache", TranslationCache(16))
+    mocker.patch.object(MLServices, "do_translation", return_value="translation_text")
+    mocker.patch.object(GCPStorageServices, "upload_file", return_value="https://video_url")
+    stages = ("digest", "translate", "upload", "store")
+
+    def observations():
+        return [REGISTRY.get_sample_value("silang_translation_stage_seconds_count", {"stage": stage}) or 0
+                for stage in stages]
+
+    before, video_bytes = observations(), REGISTRY.get_sample_value("silang_video_bytes_total")
+    client_authenticated.post("api/v1/translations/",
+                              files={"file": ("video.mp4", BytesIO(b"video_file"), "video/mp4")})
+
+    assert [after - count for after, count in zip(observations(), before)] == [1, 1, 1, 1]
+    assert REGISTRY.get_sample_value("silang_video_bytes_total") == video_bytes + len(b"video_file")
+
+
+def test_create_translation_reuses_result_of_identical_video(client_authenticated, mocker):
+    mocker.patch("src.services.translation_services.translation_cache", TranslationCache(16))
+    do_translation = mocker.patch.object(MLServices, "do_translation", return_value="translation_text")
+    mocker.patch.object(GCPStorageServices, "upload_file", return_value="https://video_url")
+
+    for _ in range(2):
+        response = client_authenticated.post(
+            "api/v1/translations/",
+            files={"file": ("video.mp4", BytesIO(b"same_video_file"), "video/mp4")}
+        )
+
+        assert response.status_code == 201
+        assert response.json()["translation_text"] == "translation_text"
+
+    do_translation.assert_called_once()
+
+
+def test_create_translation_uploads_while_translating(client_authenticated, mocker):
+    mocker.patch("src.services.translation_services.translation_cache", TranslationCache(16))
+    upload_started = threading.Event()
+
+    def upload_file(file):
+        upload_started.set()
+        assert file.file.read() == b"overlapping_video_file"
+        return "https://video_url"
+
+    mocker.patch.object(GCPStorageServices, "upload_file", side_effect=upload_file)
+    mocker.patch.object(MLServices, "do_translation",
+                        side_effect=lambda file, digest: "overlapped" if upload_started.wait(5) else "sequential")
+
+    response = client_authenticated.post(
+        "api/v1/translations/",
+        files={"file": ("video.mp4", BytesIO(b"overlapping_video_file"), "video/mp4")}
+    )
+
+    assert response.status_code == 201
+    assert response.json()["translation_text"] == "overlapped"
+    assert response.json()["video_url"] == "https://video_url"
+
+
+def test_reopened_upload_is_closed_when_upload_cannot_start(mocker):
+    services = mocker.Mock()
+    services.upload_executor.submit.side_effect = RuntimeError("executor shut down")
+    reopened = UploadFile(file=BytesIO(b"video_file"))
+    mocker.patch.object(TranslationServices, "_reopen", return_value=reopened)
+
+    with pytest.raises(RuntimeError):
+        TranslationServices(None, services)._upload_while_translating(UploadFile(file=BytesIO(b"video_file")),
+                                                                      "digest", "cache_key")
+
+    assert reopened.file.closed
+
+
+def test_create_translation_deletes_upload_when_translation_fails(client_authenticated, mocker):
+    mocker.patch("src.services.translation_services.translation_cache", TranslationCache(16))
+    mocker.patch.object(MLServices, "do_translation", side_effect=ValueError("Error opening video file."))
+    mocker.patch.object(GCPStorageServices, "upload_file", return_value="https://video_url")
+    deleted = threading.Event()
+    delete_file = mocker.patch.object(GCPStorageServices, "delete_file", side_effect=lambda url: deleted.set())
+
+    with pytest.raises(ValueError):
+        client_authenticated.post(
+            "api/v1/translations/",
+            files={"file": ("video.mp4", BytesIO(b"broken_video_file"), "video/mp4")}
+        )
+
+    assert deleted.wait(5)
+    delete_file.assert_called_once_with("https://video_url")
+
+
+def test_services_are_created_once_per_application(client_authenticated, mocker):
+    mocker.patch("src.main.ML_WARMUP", False)
+    mocker.patch("src.services.translation_services.translation_cache", TranslationCache(16))
+    close = mocker.patch.object(ServiceContainer, "close")
+    do_translation = mocker.patch.object(MLServices, "do_translation", autospec=True, return_value="translation_text")
+    mocker.patch.object(GCPStorageServices, "upload_file", return_value="https://video_url")
+
+    with client_authenticated:
+        for content in (b"first_video_file", b"second_video_file"):
+            response = client_authenticated.post(
+                "api/v1/translations/",
+                files={"file": ("video.mp4", BytesIO(content), "video/mp4")}
+            )
+            assert response.status_code == 201
+
+        services = app.state.services
+        close.assert_not_called()
+
+    close.assert_called_once()
+    assert [call.args[0] for call in do_translation.call_args_list] == [services.ml_service] * 2
+
+
 def test_create_translation_unauthorized(client_not_authenticated):
     video_file = ("video.mp4", BytesIO(b"video_file"), "video/mp4")
     response = client_not_authenticated.post(
@@ -79,6 +215,71 @@ def test_create_translation_unauthorized(client_not_authenticated):
     assert response.status_code == 401
 
 
+def test_create_translation_job_success(client_authenticated, translation_jobs_use_test_db, mocker):
+    mocker.patch.object(MLServices, "do_translation", return_value="translation_text")
+    upload_file = mocker.patch.object(GCPStorageServices, "upload_file", return_value="https://video_url")
+
+    video_file = ("video.mp4", BytesIO(b"job_video_file"), "video/mp4")
+
+    response = client_authenticated.post(
+        "api/v1/translations/jobs",
+        files={"file": video_file}
+    )
+
+    assert response.status_code == 202
+    assert response.json()["status"] in ("queued", "running")
+
+    response = wait_for_job(client_authenticated, response.json()["id"])
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["translation"]["user_id"] == 1
+    assert response.json()["translation"]["translation_text"] == "translation_text"
+    assert response.json()["translation"]["video_url"] == "https://video_url"
+    assert upload_file.call_args.args[0].size == len(b"job_video_file")
+
+
+def test_create_translation_job_failure(client_authenticated, translation_jobs_use_test_db, mocker):
+    mocker.patch("src.services.translation_services.translation_cache", TranslationCache(16))
+    mocker.patch.object(MLServices, "do_translation", side_effect=ValueError("Error opening video file."))
+
+    video_file = ("video.mp4", BytesIO(b"broken_video_file"), "video/mp4")
+
+    response = client_authenticated.post(
+        "api/v1/translations/jobs",
+        files={"file": video_file}
+    )
+    response = wait_for_job(client_authenticated, response.json()["id"])
+
+    assert response.json()["status"] == "failed"
+    assert response.json()["translation"] is None
+    assert response.json()["detail"] == "Translation failed."
+
+
+def test_get_translation_job_forbidden(client_authenticated, translation_jobs_use_test_db, mocker):
+    mocker.patch.object(MLServices, "do_translation", return_value="translation_text")
+    mocker.patch.object(GCPStorageServices, "upload_file", return_value="https://video_url")
+    services = ServiceContainer.create()
+    job = translation_jobs.submit(UploadFile(file=BytesIO(b"video_file"), filename="video.mp4"),
+                                  UserRead(id=2, username="janedoe"), services)
+
+    response = client_authenticated.get(f"api/v1/translations/jobs/{job.id}")
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Access to this resource is not allowed."
+
+    while job.status not in ("succeeded", "failed"):
+        time.sleep(0.01)
+    services.close()
+
+
+def test_get_translation_job_not_found(client_authenticated):
+    response = client_authenticated.get("api/v1/translations/jobs/unknown")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Translation job not found."
+
+
 def test_get_translation_by_id(client_authenticated, add_translations_to_db):
     response = client_authenticated.get("api/v1/translations/1")
 
@@ -107,6 +308,54 @@ def test_get_current_user_translations(client_authenticated, add_translations_to
     assert len(response.json()) == 2
 
 
+@pytest.mark.parametrize("method, url, body, max_queries", [
+    ("GET", "api/v1/translations/1", None, 1),
+    ("GET", "api/v1/translations/me", None, 1),
+    ("PUT", "api/v1/translations/1/feedbacks", {"feedback": "feedback"}, 3),
+])
+def test_translation_query_budget(client_authenticated, add_translations_to_db, method, url, body, max_queries):
+    response = client_authenticated.request(method, url, json=body)
+
+    assert response.status_code == 200
+    assert_query_budget(response, max_queries)
+
+
+def test_get_current_user_translations_paginated(client_authenticated, test_db):
+    test_db.add_all([
+        Translation(user_id=1 if i % 3 else 2, video_url="url", translation_text=f"translation {i}",
+                    date_time_created=datetime.now())
+        for i in range(1, 11)
+    ])
+    test_db.commit()
+
+    pages, after = [], None
+    while True:
+        response = client_authenticated.get("api/v1/translations/me",
+                                            params={"limit": 3, **({"after": after} if after else {})})
+        assert response.status_code == 200
+        pages.append([translation["id"] for translation in response.json()])
+        after = response.headers.get("X-Next-Cursor")
+        if not after:
+            break
+
+    assert pages == [[10, 8, 7], [5, 4, 2], [1]]
+
+
+def test_get_current_user_translations_invalid_cursor(client_authenticated, add_translations_to_db):
+    response = client_authenticated.get("api/v1/translations/me", params={"after": "not a cursor"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor."
+
+
+@pytest.mark.parametrize("id", [0, 2 ** 31, 99999999999999999999])
+def test_get_current_user_translations_cursor_out_of_range(client_authenticated, add_translations_to_db, id):
+    response = client_authenticated.get("api/v1/translations/me", params={"after": encode_cursor(id)})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor."
+
+
 def test_get_current_user_translations_not_found(client_authenticated):
     response = client_authenticated.get("api/v1/translations/me")
 
@@ -0,0 +1,37 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from src.services.upload_services import atomic_write, copy_stream
+
+
+def test_copy_stream_returns_bytes_copied():
+    source = BytesIO(b"header video_file")
+    source.seek(len(b"header "))
+    target = BytesIO(b"existing ")
+    target.seek(0, os.SEEK_END)
+
+    assert copy_stream(source, target) == len(b"video_file")
+    assert target.getvalue() == b"existing video_file"
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = tmp_path / "model.tflite"
+    path.write_bytes(b"old")
+
+    with atomic_write(str(path)) as f:
+        f.write(b"new")
+        assert path.read_bytes() == b"old"
+
+    assert path.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["model.tflite"]
+
+
+def test_atomic_write_removes_temporary_file_on_error(tmp_path):
+    with pytest.raises(ValueError):
+        with atomic_write(str(tmp_path / "model.tflite")) as f:
+            f.write(b"partial")
+            raise ValueError()
+
+    assert os.listdir(tmp_path) == []